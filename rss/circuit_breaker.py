@@ -0,0 +1,73 @@
+import time
+from typing import Optional
+
+
+class CircuitBreaker():
+    """
+    Failure tracking for one host.
+
+    After `threshold` failed fetches in a row the breaker opens and fetches to the host are skipped.
+    Once the backoff has passed it is half-open: one probe fetch is let through, which closes
+    the breaker if it works or opens it again with twice the backoff if it fails.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    # a probe that never reported back, for example because it was cancelled, is replaced after this many seconds
+    PROBE_TIMEOUT = 120
+
+    def __init__(self, threshold: int = 3, base_backoff: int = 60, max_backoff: int = 3600):
+        self.threshold = threshold
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.failures = 0
+        # how many times the breaker opened in a row, without a working fetch in between
+        self.trips = 0
+        self.opened_until = 0.0
+        self.probe_started = None
+
+    @property
+    def state(self) -> str:
+        if self.trips == 0:
+            return self.CLOSED
+        if time.monotonic() < self.opened_until:
+            return self.OPEN
+        return self.HALF_OPEN
+
+    def retry_in(self) -> Optional[float]:
+        """Seconds until the next probe fetch is allowed, None when the breaker is closed."""
+        if self.trips == 0:
+            return None
+        return max(0.0, self.opened_until - time.monotonic())
+
+    def allow(self) -> bool:
+        """Returns whether a fetch to the host should be made, a half-open breaker allows a single probe."""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        now = time.monotonic()
+        if state == self.HALF_OPEN and (self.probe_started is None or now - self.probe_started > self.PROBE_TIMEOUT):
+            self.probe_started = now
+            return True
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        self.trips = 0
+        self.opened_until = 0.0
+        self.probe_started = None
+
+    def record_failure(self):
+        probing = self.probe_started is not None
+        if self.state == self.OPEN and not probing:
+            # a fetch that started before the breaker opened
+            return
+        self.failures += 1
+        if probing or self.failures >= self.threshold:
+            self.trips += 1
+            backoff = min(self.base_backoff * 2 ** (self.trips - 1), self.max_backoff)
+            self.opened_until = time.monotonic() + backoff
+            self.failures = 0
+            self.probe_started = None
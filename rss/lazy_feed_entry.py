@@ -0,0 +1,31 @@
+from collections import ChainMap
+
+import feedparser
+
+
+class LazyFeedEntry(ChainMap):
+    """
+    A feed entry with bs4-discovered tags layered over it, only the tags that are needed are built.
+
+    Tags are built in the parser pool with build_tags and added with add_tags, lookups never build tags
+    so that they don't block the event loop. Tags that weren't built are missing from the entry.
+    """
+
+    def __init__(self, entry: feedparser.util.FeedParserDict):
+        super().__init__({}, entry)
+        # whether every tag was built
+        self.complete = False
+
+    @property
+    def entry(self) -> feedparser.util.FeedParserDict:
+        return self.maps[1]
+
+    def add_tags(self, tags: dict, *, complete: bool = False):
+        """Adds built tags, set complete when the tags are from a full build."""
+        for tag_name, tag_content in tags.items():
+            if tag_name == "is_special":
+                is_special = self.maps[0].setdefault("is_special", [])
+                is_special.extend(name for name in tag_content if name not in is_special)
+            else:
+                self.maps[0][tag_name] = tag_content
+        self.complete = self.complete or complete
@@ -0,0 +1,52 @@
+import re
+import xml.etree.ElementTree as ET
+from urllib.parse import urlparse
+
+
+# OPML files bigger than this are not read
+MAX_OPML_SIZE = 1024 * 1024
+MAX_FEED_NAME_LENGTH = 50
+
+
+class OPMLError(Exception):
+    pass
+
+
+def feed_name_from_title(title: str, url: str):
+    """Makes a feed name that can be typed in commands from an OPML title, or the website if there is none."""
+    name = re.sub(r"[^\w-]+", "-", (title or urlparse(url).netloc).lower()).strip("-")
+    return name[:MAX_FEED_NAME_LENGTH].strip("-") or "feed"
+
+
+def parse_opml(content: bytes):
+    """
+    Returns (title, url) for every feed in an OPML file, in the order they are in the file.
+    Feeds in folders are included, folders themselves are not.
+    """
+    try:
+        root = ET.fromstring(content)
+    except ET.ParseError as e:
+        raise OPMLError(f"The file is not valid OPML: {e}")
+    if root.tag.lower() != "opml":
+        raise OPMLError("The file is not an OPML file.")
+
+    feeds = []
+    for outline in root.iter("outline"):
+        # feed readers don't agree on the case of the attribute names
+        attributes = {key.lower(): value.strip() for key, value in outline.attrib.items()}
+        url = attributes.get("xmlurl")
+        if url:
+            feeds.append((attributes.get("title") or attributes.get("text"), url))
+    return feeds
+
+
+def build_opml(title: str, feeds: dict):
+    """Returns an OPML file of the feeds of a channel, `feeds` is the feed data of the channel by feed name."""
+    root = ET.Element("opml", version="2.0")
+    head = ET.SubElement(root, "head")
+    ET.SubElement(head, "title").text = title
+    body = ET.SubElement(root, "body")
+    for feed_name, feed_data in feeds.items():
+        outline = ET.SubElement(body, "outline", type="rss", text=feed_name, title=feed_name, xmlUrl=feed_data["url"])
+        outline.tail = "\n"
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
@@ -0,0 +1,34 @@
+import discord
+
+
+# Discord's limits for the embeds of a single message
+MAX_EMBEDS = 10
+MAX_EMBED_CHARACTERS = 6000
+
+
+def text_post(content: str) -> dict:
+    """Returns an outbox post for a plain text message."""
+    return {"content": content}
+
+
+def embed_post(embed: discord.Embed) -> dict:
+    """Returns an outbox post for an embed, posts are plain dicts so that they can be saved in config."""
+    return {"embed": embed.to_dict(), "length": len(embed)}
+
+
+def next_batch(posts: list) -> int:
+    """
+    Returns how many posts from the start of an outbox are sent together as one message.
+
+    Consecutive embed posts are bundled while they fit in one message, text posts are always sent on their own.
+    """
+    if "embed" not in posts[0]:
+        return 1
+    count = 0
+    length = 0
+    for post in posts[:MAX_EMBEDS]:
+        if "embed" not in post or (count and length + post["length"] > MAX_EMBED_CHARACTERS):
+            break
+        count += 1
+        length += post["length"]
+    return count
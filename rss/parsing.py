@@ -0,0 +1,360 @@
+"""
+Feed parsing and tag enrichment.
+
+Everything in here is synchronous and free of cog state so that it can run in the
+parser pool, a thread or a process pool, without blocking the event loop.
+Arguments and return values need to stay picklable for the process pool.
+"""
+import datetime
+import hashlib
+import re
+import time
+from urllib.parse import urlparse
+
+import feedparser
+from bs4 import BeautifulSoup
+
+from redbot.core.utils.chat_formatting import escape, humanize_list
+
+from .tag_type import INTERNAL_TAGS, TagType
+
+PLAINTEXT_LIST_RE = re.compile("^(?P<source>.+)_plaintext\\d{2}$")
+
+
+def parse_feed(content: bytes):
+    """
+    Parse raw feed content into a plain dict: bozo state, channel header and items.
+    The seconds spent parsing are included, timed in the worker so that time spent waiting for one isn't counted.
+    """
+    start = time.perf_counter()
+    feedparser_obj = feedparser.parse(content)
+    bozo_exception = feedparser_obj.get("bozo_exception", None)
+    return {
+        "parse_time": time.perf_counter() - start,
+        "bozo": feedparser_obj.bozo,
+        # parser exceptions can hold references that don't pickle, the message is all that is used
+        "bozo_exception": str(bozo_exception) if bozo_exception else None,
+        "feed": feedparser_obj.feed,
+        "entries": feedparser_obj.entries,
+    }
+
+
+def is_url(url: str):
+    """Checks if a string is a full url with a scheme, domain and path."""
+    try:
+        result = urlparse(url)
+    except Exception:
+        return False
+    return all([result.scheme, result.netloc, result.path])
+
+
+def entry_fingerprint(entry: feedparser.util.FeedParserDict, entry_time: int = None):
+    """
+    64-bit fingerprint of an entry's identity: guid, link, title and post time.
+
+    The guid is stable across title edits, so link and title are only used when an entry has no guid.
+    """
+    guid = entry.get("id", "")
+    if guid:
+        parts = (guid, entry_time)
+    else:
+        parts = (entry.get("link", ""), entry.get("title", ""), entry_time)
+    identity = "\x1f".join(str(part) for part in parts)
+    return int.from_bytes(hashlib.blake2b(identity.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def body_digest(content: bytes):
+    """128-bit digest of a raw feed response, to tell whether the exact same bytes were served again."""
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+def html_to_plaintext(bs4_soup: BeautifulSoup):
+    """
+    Bs4's .text attribute on a soup strips newlines and spaces
+    This provides newlines and more readable content.
+    """
+    text = ""
+    for element in bs4_soup.descendants:
+        if isinstance(element, str):
+            text += element
+        elif element.name == "br" or element.name == "p" or element.name == "li":
+            text += "\n"
+    text = re.sub("\\n+", "\n", text)
+    text = text.replace("*", "\\*")
+    text = text.replace("SC_OFF", "").replace("SC_ON", "\n")
+    text = text.replace("[link]", "").replace("[comments]", "")
+
+    return escape(text)
+
+
+def get_tag_content_type(tag_content):
+    """
+    Tag content type can be:
+        str, list, dict (FeedParserDict), bool, datetime.datetime object or time.struct_time
+    """
+    try:
+        if tag_content["type"] == "text/html":
+            return TagType(2)
+    except (KeyError, TypeError):
+        html_tags = ["<a>", "<a href", "<img", "<p>", "<b>", "</li>", "</ul>"]
+        if any(word in str(tag_content) for word in html_tags):
+            return TagType(2)
+
+    if isinstance(tag_content, dict):
+        return TagType(3)
+    elif isinstance(tag_content, list):
+        return TagType(4)
+    else:
+        return TagType(1)
+
+
+def add_content_images(bs4_soup: BeautifulSoup, tags: dict):
+    """
+    $content_images should always be marked as a special tag as the tags will
+    be dynamically generated based on the content included in the latest post.
+    """
+    content_images = bs4_soup.find_all("img")
+    if content_images:
+        for i, image in enumerate(content_images):
+            tag_name = f"content_image{str(i + 1).zfill(2)}"
+            try:
+                tags[tag_name] = image["src"]
+                tags["is_special"].append(tag_name)
+            except KeyError:
+                pass
+    return tags
+
+
+def build_bs4_tags(entry: feedparser.util.FeedParserDict, sources=None):
+    """
+    Build bs4-discovered tags for a feedparser entry.
+
+    The tags are returned in a separate dict that can be layered over the entry,
+    the entry itself is never modified. If sources is given, only those entry tags are processed.
+    """
+    tags = {"is_special": []}
+    soup = None
+    tags_list = []
+
+    for tag_name, tag_content in entry.items():
+        if tag_name in INTERNAL_TAGS:
+            continue
+        if sources is not None and tag_name not in sources:
+            continue
+
+        tag_content_check = get_tag_content_type(tag_content)
+
+        if tag_content_check == TagType.HTML:
+            # this is a tag that is only html content
+            try:
+                soup = BeautifulSoup(tag_content, "html.parser")
+            except TypeError:
+                pass
+
+            # this is a standard html format summary_detail tag
+            # the tag was determined to be html through the type attrib that
+            # was attached from the feed publisher but it's really a dict.
+            try:
+                soup = BeautifulSoup(tag_content["value"], "html.parser")
+            except (KeyError, TypeError):
+                pass
+
+            # this is a standard html format content or summary tag
+            try:
+                soup = BeautifulSoup(tag_content[0]["value"], "html.parser")
+            except (KeyError, TypeError):
+                pass
+
+            if soup:
+                tags[f"{tag_name}_plaintext"] = html_to_plaintext(soup)
+
+        if tag_content_check == TagType.LIST:
+            tags_content_counter = 0
+
+            for list_item in tag_content:
+                list_item_check = get_tag_content_type(list_item)
+
+                # for common "links" format or when "content" is a list
+                list_html_content_counter = 0
+                if list_item_check == TagType.HTML:
+                    list_tags = ["value", "href"]
+                    for tag in list_tags:
+                        try:
+                            url_check = is_url(list_item[tag])
+                            if not url_check:
+                                # bs4 will cry if you try to give it a url to parse, so let's only
+                                # parse non-url content
+                                tag_content = BeautifulSoup(list_item[tag], "html.parser")
+                                tag_content = html_to_plaintext(tag_content)
+                            else:
+                                tag_content = list_item[tag]
+                            list_html_content_counter += 1
+                            name = f"{tag_name}_plaintext{str(list_html_content_counter).zfill(2)}"
+                            tags[name] = tag_content
+                            tags["is_special"].append(name)
+                        except (KeyError, TypeError):
+                            pass
+
+                if list_item_check == TagType.DICT:
+                    authors_content_counter = 0
+                    enclosure_content_counter = 0
+                    enclosure_url_counter = 0
+
+                    # common "authors" tag format
+                    try:
+                        authors_content_counter += 1
+                        name = f"{tag_name}_plaintext{str(authors_content_counter).zfill(2)}"
+                        tag_content = BeautifulSoup(list_item["name"], "html.parser")
+                        tags[name] = tag_content.get_text()
+                        tags["is_special"].append(name)
+                    except KeyError:
+                        pass
+
+                    # common "enclosure" tag image format
+                    # note: this is not adhering to RSS feed specifications
+                    # proper enclosure tags should have `length`, `type`, `url`
+                    # and not `href`, `type`, `rel`
+                    # but, this is written for the first feed I have seen with an "enclosure" tag
+                    try:
+                        image_url = list_item["href"]
+                        image_type = list_item["type"]
+                        image_rel = list_item["rel"]
+                        enclosure_content_counter += 1
+                        name = f"media_plaintext{str(enclosure_content_counter).zfill(2)}"
+                        tags[name] = image_url
+                        tags["is_special"].append(name)
+                    except KeyError:
+                        pass
+
+                    # special tag for enclosure["url"] so that users can differentiate them
+                    # from image urls found in enclosure["href"]
+                    try:
+                        image_url = list_item["url"]
+                        enclosure_url_counter += 1
+                        name = f"media_url{str(enclosure_url_counter).zfill(2)}"
+                        tags[name] = image_url
+                        tags["is_special"].append(name)
+                    except KeyError:
+                        pass
+
+                    # common "tags" tag format
+                    try:
+                        tag = list_item["term"]
+                        tags_content_counter += 1
+                        name = f"{tag_name}_plaintext{str(tags_content_counter).zfill(2)}"
+                        tags[name] = tag
+                        tags["is_special"].append(name)
+                        tags_list.append(tag) if tag not in tags_list else tags_list
+                    except KeyError:
+                        pass
+
+            if len(tags_list) > 0:
+                tags["tags_list"] = tags_list
+                tags["tags_plaintext_list"] = humanize_list(tags_list)
+                tags["is_special"].append("tags_list")
+                tags["is_special"].append("tags_plaintext_list")
+
+    # if image dict tag exists, check for an image
+    try:
+        tags["image_plaintext"] = entry["image"]["href"]
+        tags["is_special"].append("image_plaintext")
+    except KeyError:
+        pass
+
+    # if media_thumbnail or media_content exists, return the first friendly url
+    try:
+        tags["media_content_plaintext"] = entry["media_content"][0]["url"]
+        tags["is_special"].append("media_content_plaintext")
+    except KeyError:
+        pass
+    try:
+        tags["media_thumbnail_plaintext"] = entry["media_thumbnail"][0]["url"]
+        tags["is_special"].append("media_thumbnail_plaintext")
+    except KeyError:
+        pass
+
+    # change published_parsed and updated_parsed into a datetime object for embed footers
+    for time_tag in ["updated_parsed", "published_parsed"]:
+        try:
+            if isinstance(entry[time_tag], time.struct_time):
+                tags[f"{time_tag}_datetime"] = datetime.datetime(*entry[time_tag][:6])
+        except KeyError:
+            pass
+
+    if soup:
+        tags = add_content_images(soup, tags)
+
+    # add special tag/special site formatter here if needed in the future
+
+    return tags
+
+
+MULTI_SOURCE_HTML_TAGS = ("content_image",)
+MULTI_SOURCE_LIST_TAGS = ("media_plaintext", "media_url", "tags_list", "tags_plaintext_list")
+
+
+def _html_and_list_tags(entry: feedparser.util.FeedParserDict):
+    html_tags = []
+    list_tags = []
+    for tag_name, tag_content in entry.items():
+        tag_content_check = get_tag_content_type(tag_content)
+        if tag_content_check == TagType.HTML:
+            html_tags.append(tag_name)
+        elif tag_content_check == TagType.LIST:
+            list_tags.append(tag_name)
+    return html_tags, list_tags
+
+
+def tag_sources(entry: feedparser.util.FeedParserDict, tag_names):
+    """Finds the entry tags that the given bs4-discovered tags are built from."""
+    html_tags, list_tags = _html_and_list_tags(entry)
+
+    sources = set()
+    for tag_name in tag_names:
+        if tag_name in entry:
+            # not a bs4-discovered tag
+            continue
+        if tag_name.startswith(MULTI_SOURCE_HTML_TAGS):
+            # content images are taken from the last html tag in the entry
+            sources.update(html_tags)
+        elif tag_name.startswith(MULTI_SOURCE_LIST_TAGS):
+            # these are collected over every list tag in the entry
+            sources.update(list_tags)
+        elif tag_name.endswith("_parsed_datetime"):
+            # feedparser falls back to published_parsed when updated_parsed is missing
+            sources.update([tag_name[: -len("_datetime")], "published_parsed"])
+        elif tag_name.endswith("_plaintext"):
+            sources.add(tag_name[: -len("_plaintext")])
+        else:
+            match = PLAINTEXT_LIST_RE.match(tag_name)
+            if match:
+                sources.add(match.group("source"))
+
+    return {source for source in sources if source not in INTERNAL_TAGS}
+
+
+def build_tags(entry: feedparser.util.FeedParserDict, tag_names=None):
+    """
+    Builds the bs4-discovered tags of an entry, see build_bs4_tags.
+
+    If tag_names is given, only the entry tags those are built from are processed. Tags that
+    can't be built from the entry are left out, missing tags are the same as with a full build.
+    """
+    if tag_names is None:
+        return build_bs4_tags(entry)
+
+    sources = tag_sources(entry, tag_names)
+    tags = build_bs4_tags(entry, sources)
+
+    # tags built from several entry tags are left out unless all of those were processed,
+    # otherwise they could differ from a full build
+    html_tags, list_tags = _html_and_list_tags(entry)
+    incomplete = ()
+    if not sources.issuperset(html_tags):
+        incomplete += MULTI_SOURCE_HTML_TAGS
+    if not sources.issuperset(list_tags):
+        incomplete += MULTI_SOURCE_LIST_TAGS
+    if incomplete:
+        tags = {tag_name: tag_content for tag_name, tag_content in tags.items() if not tag_name.startswith(incomplete)}
+        tags["is_special"] = [tag_name for tag_name in tags["is_special"] if not tag_name.startswith(incomplete)]
+    return tags
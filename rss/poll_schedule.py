@@ -0,0 +1,145 @@
+import calendar
+import email.utils
+import re
+import statistics
+import time
+from typing import Mapping, Optional
+
+
+MAX_AGE_RE = re.compile(r"(?:^|,)\s*(?:s-)?max-age\s*=\s*\"?(\d+)", re.IGNORECASE)
+
+# seconds in each sy:updatePeriod, see https://web.resource.org/rss/1.0/modules/syndication/
+UPDATE_PERIODS = {"hourly": 3600, "daily": 86400, "weekly": 604800, "monthly": 2592000, "yearly": 31536000}
+
+# how much longer an idle feed waits after each check without new entries
+BACKOFF_FACTOR = 1.5
+
+
+def cache_hint_from_headers(headers: Mapping) -> Optional[int]:
+    """Returns how many seconds a response may be cached for according to Cache-Control or Expires."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-cache" in cache_control.lower() or "no-store" in cache_control.lower():
+        return None
+    match = MAX_AGE_RE.search(cache_control)
+    if match:
+        return int(match.group(1))
+
+    expires = headers.get("Expires")
+    if expires:
+        try:
+            expires_at = email.utils.parsedate_to_datetime(expires).timestamp()
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return max(0, int(expires_at - time.time()))
+    return None
+
+
+def feed_hint(feed: Mapping) -> Optional[int]:
+    """Returns how often a feed says it is updated in seconds, from <ttl> or sy:updatePeriod/sy:updateFrequency."""
+    hints = []
+    try:
+        hints.append(int(feed["ttl"]) * 60)
+    except (KeyError, TypeError, ValueError):
+        pass
+
+    period = UPDATE_PERIODS.get(str(feed.get("sy_updateperiod", "")).strip().lower())
+    if period:
+        try:
+            frequency = max(1, int(feed.get("sy_updatefrequency", 1)))
+        except (TypeError, ValueError):
+            frequency = 1
+        hints.append(period // frequency)
+
+    hints = [hint for hint in hints if hint > 0]
+    return max(hints) if hints else None
+
+
+def entry_cadence(entries) -> Optional[int]:
+    """
+    Returns a check interval in seconds from the time between the posts of a feed.
+
+    Half of the median gap between posts is used, so that a feed is usually checked
+    at least once between two of its posts. None is returned when the entries are undated.
+    """
+    times = []
+    for entry in entries:
+        entry_time = entry.get("published_parsed") or entry.get("updated_parsed")
+        if entry_time:
+            times.append(calendar.timegm(entry_time))
+    times = sorted(set(times), reverse=True)
+    if len(times) < 2:
+        return None
+
+    gaps = [newer - older for newer, older in zip(times, times[1:])]
+    return int(statistics.median(gaps) / 2)
+
+
+class PollSchedule():
+    """
+    Per-url check intervals for the feed loop.
+
+    Feeds that post often are checked every cycle, while feeds that have not had new entries
+    are checked less often each time, up to the maximum interval. Cache headers and the update
+    period a feed gives for itself are honored within the same bounds.
+    """
+
+    def __init__(self):
+        # url: unix time of the next check
+        self._next_check = {}
+        # url: seconds between checks
+        self._intervals = {}
+        # url: seconds from Cache-Control/Expires of the last response
+        self._header_hints = {}
+        # url: seconds from <ttl> or sy:updatePeriod of the last parsed feed
+        self._feed_hints = {}
+        # url: check interval from the time between posts of the last parsed feed
+        self._cadences = {}
+
+    def is_due(self, url: str, now: float = None) -> bool:
+        """Urls that were never checked are always due."""
+        now = time.time() if now is None else now
+        return self._next_check.get(url, 0) <= now
+
+    def interval(self, url: str) -> Optional[int]:
+        return self._intervals.get(url)
+
+    def next_check(self, url: str) -> Optional[float]:
+        return self._next_check.get(url)
+
+    def forget(self, url: str):
+        """Drops everything known about a url, for urls that no channel uses anymore."""
+        for url_data in (self._next_check, self._intervals, self._header_hints, self._feed_hints, self._cadences):
+            url_data.pop(url, None)
+
+    def set_headers(self, url: str, headers: Mapping):
+        """Saves the cache lifetime of a response, 304 responses can carry new cache headers too."""
+        self._header_hints[url] = cache_hint_from_headers(headers)
+
+    def record(
+        self, url: str, feedparser_obj, *, changed: bool, checked_at: float, min_interval: int, max_interval: int
+    ) -> int:
+        """
+        Schedules the next check of a url after it was checked in the feed loop, returns the new interval.
+
+        `changed` is whether the check found entries that were not seen before and
+        `checked_at` is the unix time the feed loop cycle started.
+        """
+        if getattr(feedparser_obj, "entries", None) is not None:
+            self._feed_hints[url] = feed_hint(feedparser_obj.get("feed", {}))
+            self._cadences[url] = entry_cadence(feedparser_obj.entries)
+        cadence = self._cadences.get(url) or 0
+
+        if changed:
+            interval = cadence
+        else:
+            interval = max(self._intervals.get(url, min_interval) * BACKOFF_FACTOR, cadence)
+
+        for hint in (self._header_hints.get(url), self._feed_hints.get(url)):
+            if hint:
+                interval = max(interval, hint)
+
+        interval = int(min(max(interval, min_interval), max_interval))
+        self._intervals[url] = interval
+        # allow a bit of slack so that a url isn't skipped by a cycle that starts a moment early
+        self._next_check[url] = checked_at + interval - min(30, min_interval / 10)
+        return interval
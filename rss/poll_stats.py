@@ -0,0 +1,102 @@
+import time
+from collections import Counter, defaultdict, deque
+from urllib.parse import urlparse
+
+
+def percentile(values: list, percent: float):
+    """Nearest-rank percentile of a list of numbers, None for an empty list."""
+    if not values:
+        return None
+    values = sorted(values)
+    index = max(0, min(len(values) - 1, round(percent / 100 * len(values)) - 1))
+    return values[index]
+
+
+class PollStats():
+    """
+    Health and timing statistics of the feed loop.
+
+    Only fetches made by the feed loop are counted, rss add and rss force are left out.
+    Statistics are kept in memory and start over when the cog is reloaded.
+    """
+
+    # how many recent cycles and fetch timings per host are kept
+    HISTORY = 100
+
+    def __init__(self):
+        self.started_at = time.time()
+        # dicts of cycle start, duration, queued feeds and fetched urls
+        self.cycles = deque(maxlen=self.HISTORY)
+        # host: recent fetch durations in seconds
+        self.host_latency = defaultdict(lambda: deque(maxlen=self.HISTORY))
+        # url: seconds spent fetching and parsing the url in its last check
+        self.feed_time = {}
+        self.fetches = 0
+        self.not_modified = 0
+        # fetches that returned the same body as the last check of the url, they are not parsed again
+        self.unchanged = 0
+        self.bytes_downloaded = 0
+        self.parse_time = 0.0
+        self.parses = 0
+        # exception or error name: count
+        self.errors = Counter()
+
+    def record_cycle(self, started_at: float, duration: float, queued: int, fetched: int):
+        self.cycles.append({"started_at": started_at, "duration": duration, "queued": queued, "fetched": fetched})
+
+    def record_fetch(self, url: str, duration: float, size: int, not_modified: bool):
+        self.fetches += 1
+        self.not_modified += not_modified
+        self.bytes_downloaded += size
+        self.host_latency[urlparse(url).netloc].append(duration)
+        self.feed_time[url] = duration
+
+    def record_unchanged(self):
+        self.unchanged += 1
+
+    def record_parse(self, url: str, duration: float):
+        self.parses += 1
+        self.parse_time += duration
+        self.feed_time[url] = self.feed_time.get(url, 0) + duration
+
+    def record_error(self, url: str, error: str, duration: float = None):
+        self.errors[error] += 1
+        if duration is not None:
+            self.host_latency[urlparse(url).netloc].append(duration)
+            self.feed_time[url] = duration
+
+    def slowest_feeds(self, top: int = 5):
+        """Returns (url, seconds) of the feed urls that took the longest to fetch and parse in their last check."""
+        return sorted(self.feed_time.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def to_dict(self, top: int = 5):
+        """Returns a snapshot of the statistics that only contains builtin types."""
+        last_cycle = self.cycles[-1] if self.cycles else None
+        durations = [cycle["duration"] for cycle in self.cycles]
+        return {
+            "started_at": self.started_at,
+            "last_cycle": dict(last_cycle) if last_cycle else None,
+            "cycle_duration": {
+                "average": sum(durations) / len(durations) if durations else None,
+                "max": max(durations, default=None),
+            },
+            "fetches": self.fetches,
+            "not_modified": self.not_modified,
+            "not_modified_ratio": self.not_modified / self.fetches if self.fetches else None,
+            "unchanged": self.unchanged,
+            "unchanged_ratio": self.unchanged / self.fetches if self.fetches else None,
+            "bytes_downloaded": self.bytes_downloaded,
+            "parses": self.parses,
+            "parse_time": self.parse_time,
+            "host_latency": {
+                host: {
+                    "p50": percentile(list(latency), 50),
+                    "p90": percentile(list(latency), 90),
+                    "p99": percentile(list(latency), 99),
+                    "samples": len(latency),
+                }
+                for host, latency in self.host_latency.items()
+            },
+            "errors": dict(self.errors),
+            "slowest_feeds": self.slowest_feeds(top),
+        }
@@ -1,3 +1,4 @@
+import functools
 from collections import ChainMap
 from string import Template
 
@@ -8,24 +9,56 @@ class QuietTemplate(Template):
     https://github.com/python/cpython/blob/919f0bc8c904d3aa13eedb2dd1fe9c6b0555a591/Lib/string.py#L123
     """
 
+    def __init__(self, template):
+        super().__init__(template)
+        self.segments = self._compile()
+
+    def _compile(self):
+        """
+        Splits the template into (literal text, tag name) pairs, the tag name is None for the last pair.
+        Escaped and invalid delimiters are kept in the literal text, like safe_substitute does.
+        """
+        segments = []
+        literal = []
+        position = 0
+        for mo in self.pattern.finditer(self.template):
+            literal.append(self.template[position:mo.start()])
+            position = mo.end()
+            named = mo.group('named') or mo.group('braced')
+            if named is not None:
+                segments.append(("".join(literal), named))
+                literal = []
+            elif mo.group('escaped') is not None:
+                literal.append(self.delimiter)
+            elif mo.group('invalid') is not None:
+                literal.append(mo.group())
+            else:
+                raise ValueError('Unrecognized named group in pattern', self.pattern)
+        literal.append(self.template[position:])
+        segments.append(("".join(literal), None))
+        return segments
+
+    def identifiers(self):
+        """Returns the tag names used in the template, in order of first appearance."""
+        return list(dict.fromkeys(named for _, named in self.segments if named is not None))
+
     def quiet_safe_substitute(self, mapping={}, /, **kws):
-        if mapping is {}:
-            mapping = kws
-        elif kws:
+        if kws:
             mapping = ChainMap(kws, mapping)
-        # Helper function for .sub()
-        def convert(mo):
-            named = mo.group('named') or mo.group('braced')
+        parts = []
+        for literal, named in self.segments:
+            parts.append(literal)
             if named is not None:
                 try:
-                    return str(mapping[named])
+                    parts.append(str(mapping[named]))
                 except KeyError:
-                    # return None instead of the tag name so that
-                    # invalid tags are not present in the feed output
-                    return None
-            if mo.group('escaped') is not None:
-                return self.delimiter
-            if mo.group('invalid') is not None:
-                return mo.group()
-            raise ValueError('Unrecognized named group in pattern', self.pattern)
-        return self.pattern.sub(convert, self.template)
+                    # leave out invalid tags instead of the tag name
+                    # so that they are not present in the feed output
+                    pass
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template: str) -> QuietTemplate:
+    """Returns a QuietTemplate for a template string, feeds with the same template share one."""
+    return QuietTemplate(template)
@@ -1,39 +1,68 @@
 import asyncio
 import aiohttp
 from bs4 import BeautifulSoup, MarkupResemblesLocatorWarning
-import copy
-import datetime
+import contextlib
 import discord
 import feedparser
 import filetype
 import io
 import itertools
 import logging
+import multiprocessing
+import os
 import re
+import secrets
+import site
 import time
 import warnings
-from typing import Optional, Union
+from collections import ChainMap, Counter, defaultdict
+from concurrent.futures import BrokenExecutor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Literal, Mapping, Optional, Union
 from types import MappingProxyType, SimpleNamespace
 from urllib.parse import urlparse
 
 from redbot.core import checks, commands, Config
 from redbot.core.utils import can_user_send_messages_in
-from redbot.core.utils.chat_formatting import bold, box, escape, humanize_list, pagify
+from redbot.core.utils.chat_formatting import bold, box, humanize_timedelta, pagify
 
+from .circuit_breaker import CircuitBreaker
 from .color import Color
-from .quiet_template import QuietTemplate
+from .lazy_feed_entry import LazyFeedEntry
+from .outbox import embed_post, next_batch, text_post
+from .opml import MAX_OPML_SIZE, OPMLError, build_opml, feed_name_from_title, parse_opml
+from .parsing import body_digest, build_tags, entry_fingerprint, get_tag_content_type, parse_feed
+from .poll_schedule import PollSchedule
+from .poll_stats import PollStats
+from .quiet_template import compile_template
 from .rss_feed import RssFeed
-from .tag_type import INTERNAL_TAGS, VALID_IMAGES, TagType
+from .seen_index import SeenIndex
+from .shard_coordinator import ShardCoordinator
+from .subscriptions import Subscriptions
+from .tag_type import IMAGE_CONTENT_TYPES, INTERNAL_TAGS, VALID_IMAGES, TagType
+from .ttl_cache import TTLCache
+from .websub import LEASE_SECONDS, RENEW_BEFORE, VERIFY_TIMEOUT, WebSubReceiver, find_hub
 
 log = logging.getLogger("red.aikaterna.rss")
 
 
 IPV4_RE = re.compile("\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}\\.\\d{1,3}")
 IPV6_RE = re.compile("([a-f0-9:]+:+)+[a-f0-9]+")
+# errors that mean a host is unreachable rather than a single feed being broken
+HOST_ERRORS = (
+    aiohttp.client_exceptions.ClientConnectorError,
+    aiohttp.client_exceptions.ServerDisconnectedError,
+    asyncio.exceptions.TimeoutError,
+)
+# folder this cog's package was loaded from, process parser workers import the cog from there
+COG_ROOT = os.path.abspath(__file__)
+for _ in __name__.split("."):
+    COG_ROOT = os.path.dirname(COG_ROOT)
+# events dispatched for new feed posts, see get_current_feed
+FEED_EVENTS = ("aikaternacogs_rss_message", "aikaternacogs_rss_feed_update")
 GuildMessageable = Union[discord.TextChannel, discord.VoiceChannel, discord.StageChannel, discord.Thread]
 
 
-__version__ = "2.1.6"
+__version__ = "2.2.0"
 
 warnings.filterwarnings(
     "ignore",
@@ -57,41 +86,299 @@ class RSS(commands.Cog):
 
         self.config = Config.get_conf(self, 2761331001, force_registration=True)
         self.config.register_channel(feeds={})
-        self.config.register_global(use_published=["www.youtube.com"])
+        # seen entry fingerprints per feed url, kept out of the channel feed data
+        self.config.init_custom("SEEN_ENTRIES", 1)
+        self.config.register_custom("SEEN_ENTRIES", index=None)
+        # posts waiting to be sent per channel id, so that they are still sent after a restart
+        self.config.init_custom("OUTBOX", 1)
+        self.config.register_custom("OUTBOX", posts=[])
+        # WebSub subscription per feed url, so that subscriptions and their secrets survive a restart
+        self.config.init_custom("WEBSUB", 1)
+        self.config.register_custom("WEBSUB", subscription=None)
+        self.config.register_global(
+            use_published=["www.youtube.com"],
+            fetch_workers=16,
+            fetch_host_limit=4,
+            parser_pool="thread",
+            parser_workers=2,
+            poll_min_interval=300,
+            poll_max_interval=1800,
+            max_feed_size=10 * 1024 * 1024,
+            shard_db=None,
+            websub_url=None,
+            websub_host="127.0.0.1",
+            websub_port=8790,
+        )
 
         self._post_queue = asyncio.PriorityQueue()
-        self._post_queue_size = None
 
         self._read_feeds_loop = None
 
+        # url: {"etag": str, "last_modified": str} from the last conditional fetch in the feed loop
+        self._url_validators = {}
+        # url: SeenIndex, loaded from config on first use
+        self._seen_index = None
+        # url: entry fingerprints from the current feed loop cycle, saved to the seen index after the cycle
+        self._seen_updates = {}
+        # url: {(channel id, feed name)} that compared against the seen index in the current cycle
+        self._seen_readers = {}
+        # url: how many channel feeds with the url were not posted yet in the current cycle or push
+        self._unposted = Counter()
+        # url: digest of the body of the last conditional fetch that parsed without errors
+        self._body_digests = {}
+        # validators and body digests from the fetches of the current cycle, they only replace the ones above
+        # once the posts of their url were queued, so that entries of a cycle that failed are fetched again
+        self._new_url_validators = {}
+        self._new_body_digests = {}
+        # when each feed url is checked next in the feed loop
+        self._poll_schedule = PollSchedule()
+
+        # global settings read from config once, cleared by the commands that change them
+        self._settings = None
+        # url: website of the entries of a feed url, which rss parse overrides go by
+        self._feed_websites = {}
+
+        # feeds of every channel, loaded from config on first use and kept up to date by the commands
+        self._subscriptions = None
+
+        # channel id: {feed name: last title/link/time}, saved once per feed loop cycle
+        self._last_scraped_updates = {}
+
+        # url: newest entry and header of a feed from its last check, for rss listtags/viewtags/force
+        self._feed_snapshots = TTLCache(maxsize=4096, ttl=10 * 60)
+
+        # image url: image type or None, feeds tend to use the same images on every post
+        self._image_types = TTLCache(maxsize=2048, ttl=6 * 60 * 60)
+        # image url: task for image urls that are being checked right now
+        self._image_checks = {}
+
+        # channel id: list of posts waiting to be sent, loaded from config on first use
+        self._outbox = None
+        # channel id: task sending the posts of that channel
+        self._outbox_senders = {}
+
+        # splits fetching between bots when sharded polling is on, all database calls run in the shard executor
+        self._shard_coordinator = None
+        self._shard_executor = None
+        # url: when the shared copy of a feed that was last used by this bot was stored
+        self._shared_versions = {}
+        self._owned_shards = 0
+
+        # url: (hub url, topic url) or None, from the last time the feed was parsed
+        self._feed_hubs = {}
+        # url: WebSub subscription dict, loaded from config when push mode is on
+        self._websub = None
+        # callback id: url of the subscription using it
+        self._websub_callbacks = {}
+        self._websub_receiver = None
+        # tasks posting pushed feeds
+        self._websub_tasks = set()
+        # feed loop cycles and pushed feeds compare against the same seen entries,
+        # so only one of them posts at a time, fetching happens outside of the lock
+        self._posting_lock = asyncio.Lock()
+
         self._headers = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:121.0) Gecko/20100101 Firefox/121.0"}
 
+        # one long-lived session for all requests so that connections and dns lookups are reused between feeds
+        self._session = None
+        self._connection_stats = {"created": 0, "reused": 0}
+        self._poll_stats = PollStats()
+        # host: CircuitBreaker, hosts that keep failing are skipped by the feed loop for a while
+        self._circuit_breakers = defaultdict(CircuitBreaker)
+        # channel id: CircuitBreaker for looking up channels with queued posts that are not in the bot's cache
+        self._channel_lookups = defaultdict(lambda: CircuitBreaker(threshold=1))
+
+        # feed parsing and bs4 tag enrichment run in this pool, created on first use from the settings
+        self._parser_pool = None
+
+    def get_stats(self, top: int = 5):
+        """
+        Returns statistics about the feed loop, for use in other cogs.
+
+        The returned dict only contains builtin types and is not updated afterwards.
+        Fetch times are in seconds, `top` is how many of the slowest feed urls are included.
+        """
+        stats = self._poll_stats.to_dict(top=top)
+        stats["connections"] = dict(self._connection_stats)
+        if self._shard_coordinator:
+            stats["sharding"] = {
+                "worker_id": self._shard_coordinator.worker_id,
+                "owned_shards": self._owned_shards,
+                "shards": ShardCoordinator.SHARDS,
+            }
+        else:
+            stats["sharding"] = None
+        websub = self._websub or {}
+        stats["websub"] = {
+            "enabled": self._websub_receiver is not None,
+            "subscriptions": len(websub),
+            "active": sum(self._websub_active(url) for url in websub),
+        }
+        outbox = self._outbox or {}
+        stats["outbox"] = {"posts": sum(len(posts) for posts in outbox.values()), "channels": len(outbox)}
+        # host: seconds until the next probe fetch
+        stats["failing_hosts"] = {
+            host: breaker.retry_in() for host, breaker in self._circuit_breakers.items() if breaker.retry_in() is not None
+        }
+        return stats
+
     async def red_delete_data_for_user(self, **kwargs):
         """Nothing to delete"""
         return
 
     def initialize(self):
+        self._session = self._create_session()
         self._read_feeds_loop = self.bot.loop.create_task(self.read_feeds())
 
-    def cog_unload(self):
+    async def cog_unload(self):
         if self._read_feeds_loop:
             self._read_feeds_loop.cancel()
+        for sender in self._outbox_senders.values():
+            sender.cancel()
+        # WebSub subscriptions are kept, the hubs keep pushing to the receiver once the cog is loaded again
+        await self._stop_websub()
+        # posts that were not sent yet are sent once the cog is loaded again
+        await self._save_outbox()
+        # their posts are already in the outbox, entries of urls that some channels didn't post yet are checked again
+        await self._save_seen_updates({url for url in self._seen_updates if not self._unposted[url]})
+        await self._flush_last_scraped()
+        if self._session:
+            await self._session.close()
+        if self._parser_pool:
+            self._parser_pool.shutdown(wait=False)
+        if self._shard_coordinator:
+            # hand this bot's shards to the other bots right away
+            await self._run_in_shard_db(self._shard_coordinator.close)
+        if self._shard_executor:
+            self._shard_executor.shutdown(wait=False)
+
+    def _create_session(self):
+        """Creates the shared session used for every request this cog makes."""
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_create_end.append(self._on_connection_create)
+        trace_config.on_connection_reuseconn.append(self._on_connection_reuse)
+
+        connector = aiohttp.TCPConnector(limit=100, limit_per_host=20, ttl_dns_cache=300, keepalive_timeout=60)
+        timeout = aiohttp.ClientTimeout(total=20)
+        return aiohttp.ClientSession(
+            connector=connector, headers=self._headers, timeout=timeout, trace_configs=[trace_config]
+        )
+
+    async def _run_in_parser_pool(self, func, *args):
+        """Runs a function from .parsing in the parser pool so that the event loop isn't blocked."""
+        if self._parser_pool is None:
+            settings = await self._get_settings()
+            pool_type = settings["parser_pool"]
+            workers = settings["parser_workers"]
+            if pool_type == "process":
+                # forking the bot while other threads hold locks can deadlock the workers, so they start fresh
+                # and import this cog's modules from the folder it was loaded from
+                start_method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                self._parser_pool = ProcessPoolExecutor(
+                    workers,
+                    mp_context=multiprocessing.get_context(start_method),
+                    initializer=site.addsitedir,
+                    initargs=(COG_ROOT,),
+                )
+            else:
+                self._parser_pool = ThreadPoolExecutor(workers, thread_name_prefix="rss_parser")
 
-    def _add_content_images(self, bs4_soup: BeautifulSoup, rss_object: feedparser.util.FeedParserDict):
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._parser_pool, func, *args)
+        except BrokenExecutor:
+            # a worker process died, a new pool will be made on the next call
+            self._parser_pool = None
+            raise
+
+    async def _get_settings(self):
+        """Returns the global settings, they are only read from config again after a command changes them."""
+        if self._settings is None:
+            settings = await self.config.all()
+            settings["use_published"] = frozenset(settings["use_published"])
+            self._settings = settings
+        return self._settings
+
+    def _clear_settings_cache(self):
+        self._settings = None
+
+    async def _uses_published(self, url: str, entries: list):
         """
-        $content_images should always be marked as a special tag as the tags will
-        be dynamically generated based on the content included in the latest post.
+        Whether a feed url is in the rss parse override list, going by the website of its first entry.
+        The website is worked out once per url instead of for every entry.
         """
-        content_images = bs4_soup.find_all("img")
-        if content_images:
-            for i, image in enumerate(content_images):
-                tag_name = f"content_image{str(i + 1).zfill(2)}"
-                try:
-                    rss_object[tag_name] = image["src"]
-                    rss_object["is_special"].append(tag_name)
-                except KeyError:
-                    pass
-        return rss_object
+        website = self._feed_websites.get(url)
+        if website is None:
+            link = entries[0].get("link") if entries else None
+            if not link:
+                return False
+            website = urlparse(link).netloc
+            self._feed_websites[url] = website
+        return website in (await self._get_settings())["use_published"]
+
+    async def _get_subscriptions(self):
+        """Returns the in-memory copy of every channel's feeds, read from config only once."""
+        if self._subscriptions is None:
+            self._subscriptions = Subscriptions(await self.config.all_channels())
+        return self._subscriptions
+
+    @contextlib.asynccontextmanager
+    async def _edit_channel_feeds(self, channel: GuildMessageable):
+        """Edits the feeds of a channel in config and updates the in-memory copy with the result."""
+        subscriptions = await self._get_subscriptions()
+        async with self.config.channel(channel).feeds() as feed_data:
+            try:
+                yield feed_data
+            finally:
+                unused_urls = subscriptions.set_channel(channel.id, feed_data)
+        await self._forget_urls(unused_urls)
+
+    async def _forget_urls(self, urls: set):
+        """Drops the seen index and poll state of urls that no channel uses anymore, a url added again starts over."""
+        if not urls:
+            return
+        for url in urls:
+            self._poll_schedule.forget(url)
+            self._url_validators.pop(url, None)
+            self._body_digests.pop(url, None)
+            self._feed_websites.pop(url, None)
+            self._shared_versions.pop(url, None)
+        await self._drop_seen_indexes(urls)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel):
+        if self._subscriptions is not None:
+            await self._forget_urls(self._subscriptions.remove_channel(channel.id))
+
+    @commands.Cog.listener()
+    async def on_raw_thread_delete(self, payload):
+        if self._subscriptions is not None:
+            await self._forget_urls(self._subscriptions.remove_channel(payload.thread_id))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        if self._subscriptions is not None:
+            unused_urls = set()
+            for channel_id in list(self._subscriptions.channels):
+                if guild.get_channel_or_thread(channel_id):
+                    unused_urls.update(self._subscriptions.remove_channel(channel_id))
+            await self._forget_urls(unused_urls)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        # feeds of a server the bot was in before are still in config
+        if self._subscriptions is None:
+            return
+        all_channels = await self.config.all_channels()
+        for channel in itertools.chain(guild.channels, guild.threads):
+            feeds = all_channels.get(channel.id, {}).get("feeds")
+            if feeds:
+                self._subscriptions.set_channel(channel.id, feeds)
+
+    async def _on_connection_create(self, session, trace_config_ctx, params):
+        self._connection_stats["created"] += 1
+
+    async def _on_connection_reuse(self, session, trace_config_ctx, params):
+        self._connection_stats["reused"] += 1
 
     async def _add_feed(self, ctx, feed_name: str, channel: GuildMessageable, url: str):
         """Helper for rss add."""
@@ -102,20 +389,15 @@ class RSS(commands.Cog):
                 await ctx.send("Couldn't fetch that feed: there were no feed objects found.")
                 return
 
-            # sort everything by time if a time value is present
-            if feedparser_obj.entries:
-                # this feed has posts
-                sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries)
-            else:
-                # this feed does not have posts, but it has a header with channel information
-                sorted_feed_by_post_time = [feedparser_obj.feed]
-
-            # add additional tags/images/clean html
-            feedparser_plus_obj = await self._add_to_feedparser_object(sorted_feed_by_post_time[0], url)
-            rss_object = await self._convert_feedparser_to_rssfeed(feed_name, feedparser_plus_obj, url)
+            rss_object, url_index = await self._build_new_feed(feed_name, url, feedparser_obj)
+            if url_index is not None:
+                self._seen_index[url] = url_index
+                await self.config.custom("SEEN_ENTRIES", url).index.set(url_index.to_json())
 
-            async with self.config.channel(channel).feeds() as feed_data:
+            async with self._edit_channel_feeds(channel) as feed_data:
                 feed_data[feed_name] = rss_object.to_json()
+            # websites with a WebSub hub push new posts instead of waiting for the feed loop
+            await self._sync_websub()
             msg = (
                 f"Feed `{feed_name}` added in channel: {channel.mention}\n"
                 f"List the template tags with `{ctx.prefix}rss listtags` "
@@ -126,180 +408,9 @@ class RSS(commands.Cog):
             await ctx.send(f"There is already an existing feed named {bold(feed_name)} in {channel.mention}.")
             return
 
-    def _add_generic_html_plaintext(self, bs4_soup: BeautifulSoup):
-        """
-        Bs4's .text attribute on a soup strips newlines and spaces
-        This provides newlines and more readable content.
-        """
-        text = ""
-        for element in bs4_soup.descendants:
-            if isinstance(element, str):
-                text += element
-            elif element.name == "br" or element.name == "p" or element.name == "li":
-                text += "\n"
-        text = re.sub("\\n+", "\n", text)
-        text = text.replace("*", "\\*")
-        text = text.replace("SC_OFF", "").replace("SC_ON", "\n")
-        text = text.replace("[link]", "").replace("[comments]", "")
-
-        return escape(text)
-
     async def _append_bs4_tags(self, rss_object: feedparser.util.FeedParserDict, url: str):
-        """Append bs4-discovered tags to an rss_feed/feedparser object."""
-        rss_object["is_special"] = []
-        soup = None
-        tags_list = []
-
-        temp_rss_obect = copy.deepcopy(rss_object)
-        for tag_name, tag_content in temp_rss_obect.items():
-            if tag_name in INTERNAL_TAGS:
-                continue
-
-            tag_content_check = await self._get_tag_content_type(tag_content)
-
-            if tag_content_check == TagType.HTML:
-                # this is a tag that is only html content
-                try:
-                    soup = BeautifulSoup(tag_content, "html.parser")
-                except TypeError:
-                    pass
-
-                # this is a standard html format summary_detail tag
-                # the tag was determined to be html through the type attrib that
-                # was attached from the feed publisher but it's really a dict.
-                try:
-                    soup = BeautifulSoup(tag_content["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                # this is a standard html format content or summary tag
-                try:
-                    soup = BeautifulSoup(tag_content[0]["value"], "html.parser")
-                except (KeyError, TypeError):
-                    pass
-
-                if soup:
-                    rss_object[f"{tag_name}_plaintext"] = self._add_generic_html_plaintext(soup)
-
-            if tag_content_check == TagType.LIST:
-                tags_content_counter = 0
-
-                for list_item in tag_content:
-                    list_item_check = await self._get_tag_content_type(list_item)
-
-                    # for common "links" format or when "content" is a list
-                    list_html_content_counter = 0
-                    if list_item_check == TagType.HTML:
-                        list_tags = ["value", "href"]
-                        for tag in list_tags:
-                            try:
-                                url_check = await self._valid_url(list_item[tag], feed_check=False)
-                                if not url_check:
-                                    # bs4 will cry if you try to give it a url to parse, so let's only
-                                    # parse non-url content
-                                    tag_content = BeautifulSoup(list_item[tag], "html.parser")
-                                    tag_content = self._add_generic_html_plaintext(tag_content)
-                                else:
-                                    tag_content = list_item[tag]
-                                list_html_content_counter += 1
-                                name = f"{tag_name}_plaintext{str(list_html_content_counter).zfill(2)}"
-                                rss_object[name] = tag_content
-                                rss_object["is_special"].append(name)
-                            except (KeyError, TypeError):
-                                pass
-
-                    if list_item_check == TagType.DICT:
-                        authors_content_counter = 0
-                        enclosure_content_counter = 0
-                        enclosure_url_counter = 0
-
-                        # common "authors" tag format
-                        try:
-                            authors_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(authors_content_counter).zfill(2)}"
-                            tag_content = BeautifulSoup(list_item["name"], "html.parser")
-                            rss_object[name] = tag_content.get_text()
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # common "enclosure" tag image format
-                        # note: this is not adhering to RSS feed specifications
-                        # proper enclosure tags should have `length`, `type`, `url`
-                        # and not `href`, `type`, `rel`
-                        # but, this is written for the first feed I have seen with an "enclosure" tag
-                        try:
-                            image_url = list_item["href"]
-                            image_type = list_item["type"]
-                            image_rel = list_item["rel"]
-                            enclosure_content_counter += 1
-                            name = f"media_plaintext{str(enclosure_content_counter).zfill(2)}"
-                            rss_object[name] = image_url
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # special tag for enclosure["url"] so that users can differentiate them
-                        # from image urls found in enclosure["href"]
-                        try:
-                            image_url = list_item["url"]
-                            enclosure_url_counter += 1
-                            name = f"media_url{str(enclosure_url_counter).zfill(2)}"
-                            rss_object[name] = image_url
-                            rss_object["is_special"].append(name)
-                        except KeyError:
-                            pass
-
-                        # common "tags" tag format
-                        try:
-                            tag = list_item["term"]
-                            tags_content_counter += 1
-                            name = f"{tag_name}_plaintext{str(tags_content_counter).zfill(2)}"
-                            rss_object[name] = tag
-                            rss_object["is_special"].append(name)
-                            tags_list.append(tag) if tag not in tags_list else tags_list
-                        except KeyError:
-                            pass
-
-                if len(tags_list) > 0:
-                    rss_object["tags_list"] = tags_list
-                    rss_object["tags_plaintext_list"] = humanize_list(tags_list)
-                    rss_object["is_special"].append("tags_list")
-                    rss_object["is_special"].append("tags_plaintext_list")
-
-        # if image dict tag exists, check for an image
-        try:
-            rss_object["image_plaintext"] = rss_object["image"]["href"]
-            rss_object["is_special"].append("image_plaintext")
-        except KeyError:
-            pass
-
-        # if media_thumbnail or media_content exists, return the first friendly url
-        try:
-            rss_object["media_content_plaintext"] = rss_object["media_content"][0]["url"]
-            rss_object["is_special"].append("media_content_plaintext")
-        except KeyError:
-            pass
-        try:
-            rss_object["media_thumbnail_plaintext"] = rss_object["media_thumbnail"][0]["url"]
-            rss_object["is_special"].append("media_thumbnail_plaintext")
-        except KeyError:
-            pass
-
-        # change published_parsed and updated_parsed into a datetime object for embed footers
-        for time_tag in ["updated_parsed", "published_parsed"]:
-            try:
-                if isinstance(rss_object[time_tag], time.struct_time):
-                    rss_object[f"{time_tag}_datetime"] = datetime.datetime(*rss_object[time_tag][:6])
-            except KeyError:
-                pass
-
-        if soup:
-            rss_object = self._add_content_images(soup, rss_object)
-
-        # add special tag/special site formatter here if needed in the future
-
-        return rss_object
+        """Layer bs4-discovered tags over an rss_feed/feedparser object, the object itself is not modified."""
+        return ChainMap(await self._run_in_parser_pool(build_tags, rss_object), rss_object)
 
     async def _check_channel_permissions(self, ctx, channel: GuildMessageable, addl_send_messages_check=True):
         """Helper for rss functions."""
@@ -329,6 +440,53 @@ class RSS(commands.Cog):
         else:
             return True
 
+    async def _build_new_feed(self, feed_name: str, url: str, feedparser_obj: feedparser.util.FeedParserDict):
+        """
+        Helper for rss add/import, makes the RssFeed of a new feed from its fetched feed.
+        Also returns a new seen index for the url, or None when the url already has one.
+        """
+        # sort everything by time if a time value is present
+        use_published = await self._uses_published(url, feedparser_obj.entries)
+        if feedparser_obj.entries:
+            # this feed has posts
+            sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries, use_published)
+        else:
+            # this feed does not have posts, but it has a header with channel information
+            sorted_feed_by_post_time = [feedparser_obj.feed]
+
+        # add additional tags/images/clean html
+        feedparser_plus_obj = await self._add_to_feedparser_object(sorted_feed_by_post_time[0], url)
+        rss_object = await self._convert_feedparser_to_rssfeed(feed_name, feedparser_plus_obj, url)
+
+        # everything that is in the feed right now counts as seen, unless the url is already used elsewhere
+        subscriptions = await self._get_subscriptions()
+        seen_index = await self._get_seen_index()
+        if url in seen_index and subscriptions.subscribers(url):
+            rss_object.seen_mark = seen_index[url].position
+            return rss_object, None
+        entry_ids = [
+            entry_fingerprint(entry, await self._time_tag_validation(entry, use_published))
+            for entry in sorted_feed_by_post_time
+        ]
+        url_index = SeenIndex(entry_ids, size=max(SeenIndex.DEFAULT_SIZE, 2 * len(entry_ids)))
+        rss_object.seen_mark = url_index.position
+        return rss_object, url_index
+
+    async def _import_feed(self, url: str, fetch_semaphore: asyncio.Semaphore, host_semaphores: dict):
+        """
+        Helper for rss import, fetches a feed once a host slot and a worker slot are free.
+        Returns the fetched feed, or an error message.
+        """
+        if not await self._valid_url(url, feed_check=False):
+            return "Invalid url."
+        async with host_semaphores[urlparse(url).netloc]:
+            async with fetch_semaphore:
+                feedparser_obj = await self._fetch_feedparser_object(url)
+        if not isinstance(feedparser_obj, feedparser.util.FeedParserDict):
+            # only the first line, bozo errors come with the full parser message
+            return (feedparser_obj.error or "Couldn't fetch that feed.").splitlines()[0]
+        return feedparser_obj
+
     async def _check_feed_existing(self, ctx, feed_name: str, channel: GuildMessageable):
         """Helper for rss functions."""
         rss_feed = await self.config.channel(channel).feeds.get_raw(feed_name, default=None)
@@ -341,7 +499,7 @@ class RSS(commands.Cog):
         rss_exists = await self._check_feed_existing(ctx, feed_name, channel)
 
         if rss_exists:
-            async with self.config.channel(channel).feeds() as rss_data:
+            async with self._edit_channel_feeds(channel) as rss_data:
                 rss_data.pop(feed_name, None)
                 return True
         return False
@@ -351,7 +509,7 @@ class RSS(commands.Cog):
         rss_exists = await self._check_feed_existing(ctx, feed_name, channel)
 
         if rss_exists:
-            async with self.config.channel(channel).feeds.all() as feed_data:
+            async with self._edit_channel_feeds(channel) as feed_data:
                 if feed_name not in feed_data:
                     feed_data[feed_name] = {}
                 feed_data[feed_name]["template"] = template
@@ -377,15 +535,39 @@ class RSS(commands.Cog):
 
         return website
 
+    def _get_cached_channel(self, channel_id: int):
+        """Helper for rss feed loop, only looks in the bot's cache so that walking every channel makes no API calls."""
+        channel = self.bot.get_channel(channel_id)
+        if channel and can_user_send_messages_in(channel.guild.me, channel):
+            return channel
+        return None
+
     async def _get_channel_object(self, channel_id: int):
-        """Helper for rss feed loop."""
+        """
+        Helper for the outbox senders.
+
+        Channels that are not cached are looked up to find out whether they were deleted while the cog
+        wasn't loaded, with a growing wait between the lookups of a channel that can't be reached.
+        """
         channel = self.bot.get_channel(channel_id)
         if not channel:
+            lookup = self._channel_lookups[channel_id]
+            if not lookup.allow():
+                return None
             try:
-                channel = await self.bot.fetch_channel(channel_id)
-            except (discord.errors.Forbidden, discord.errors.NotFound):
+                await self.bot.fetch_channel(channel_id)
+            except discord.errors.NotFound:
+                del self._channel_lookups[channel_id]
+                subscriptions = await self._get_subscriptions()
+                await self._forget_urls(subscriptions.remove_channel(channel_id))
                 return None
-        if channel and can_user_send_messages_in(channel.guild.me, channel):
+            except discord.errors.HTTPException:
+                pass
+            # Forbidden, or a channel that exists but isn't cached yet, for example while the bot reconnects
+            lookup.record_failure()
+            return None
+        self._channel_lookups.pop(channel_id, None)
+        if can_user_send_messages_in(channel.guild.me, channel):
             return channel
         return None
 
@@ -399,7 +581,12 @@ class RSS(commands.Cog):
         longest_name_len = len(max(list(all_feeds.keys()), key=len))
         for name, data in all_feeds.items():
             extra_spacing = longest_name_len - len(name)
-            feed_list.append(f"{name}{space * extra_spacing}  {data['url']}")
+            feed_line = f"{name}{space * extra_spacing}  {data['url']}"
+            breaker = self._circuit_breakers.get(urlparse(data["url"]).netloc)
+            if breaker and breaker.retry_in() is not None:
+                retry_in = humanize_timedelta(seconds=breaker.retry_in()) or "a moment"
+                feed_line += f"  [degraded: website unreachable, retrying in {retry_in}]"
+            feed_list.append(feed_line)
         return feed_list
 
     async def _get_tag_content_type(self, tag_content):
@@ -407,90 +594,212 @@ class RSS(commands.Cog):
         Tag content type can be:
             str, list, dict (FeedParserDict), bool, datetime.datetime object or time.struct_time
         """
-        try:
-            if tag_content["type"] == "text/html":
-                return TagType(2)
-        except (KeyError, TypeError):
-            html_tags = ["<a>", "<a href", "<img", "<p>", "<b>", "</li>", "</ul>"]
-            if any(word in str(tag_content) for word in html_tags):
-                return TagType(2)
-
-        if isinstance(tag_content, dict):
-            return TagType(3)
-        elif isinstance(tag_content, list):
-            return TagType(4)
-        else:
-            return TagType(1)
+        return get_tag_content_type(tag_content)
+
+    async def _get_url_content(self, url, *, conditional: bool = False):
+        """
+        Helper for rss add/_valid_url.
 
-    async def _get_url_content(self, url):
-        """Helper for rss add/_valid_url."""
+        With conditional set, the cache validators saved from the last conditional fetch of the url are sent
+        and (None, None) is returned when the server answers with 304 Not Modified. New validators are
+        only used after the feed loop queued the posts of the url, see _keep_validators.
+        Only the feed loop should use conditional fetches, everything else always needs the content,
+        and only conditional fetches are counted in the feed loop stats.
+        """
+        start = time.perf_counter()
+        max_size = (await self._get_settings())["max_feed_size"]
         try:
             # force github.com to serve us xml instead of json
-            headers = self._headers
+            headers = dict(self._headers)
             if "github.com" in url:
                 headers["Accept"] = "application/vnd.github+xml"
 
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    if resp.status == 404:
-                        friendly_msg = "The server returned 404 Not Found. Check your url and try again."
-                        return None, friendly_msg
-                    html = await resp.read()
+            validators = self._url_validators.get(url, {}) if conditional else {}
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+            async with self._session.get(url, headers=headers) as resp:
+                if conditional:
+                    self._poll_schedule.set_headers(url, resp.headers)
+                    if resp.status >= 500:
+                        self._circuit_breakers[urlparse(url).netloc].record_failure()
+                    else:
+                        self._circuit_breakers[urlparse(url).netloc].record_success()
+                if resp.status == 304 and validators:
+                    if conditional:
+                        self._poll_stats.record_fetch(url, time.perf_counter() - start, 0, not_modified=True)
+                    return None, None
+                if resp.status == 404:
+                    if conditional:
+                        self._poll_stats.record_error(url, "HTTP 404", time.perf_counter() - start)
+                    friendly_msg = "The server returned 404 Not Found. Check your url and try again."
+                    return None, friendly_msg
+                html = await self._read_limited(resp, max_size)
+                if html is None:
+                    if conditional:
+                        self._poll_stats.record_error(url, "Too large", time.perf_counter() - start)
+                    friendly_msg = f"The content is larger than the maximum feed size of {max_size / 1024 / 1024:.4g} MB."
+                    log.warning(f"Not reading feed at url:\n\t{url}\nIt is larger than {max_size / 1024 / 1024:.4g} MB.")
+                    return None, friendly_msg
+                if conditional:
+                    self._poll_stats.record_fetch(url, time.perf_counter() - start, len(html), not_modified=False)
+                    self._new_url_validators[url] = {
+                        "etag": resp.headers.get("ETag"),
+                        "last_modified": resp.headers.get("Last-Modified"),
+                    }
             return html, None
-        except aiohttp.client_exceptions.ClientConnectorError:
+        except aiohttp.client_exceptions.ClientConnectorError as e:
+            if conditional:
+                self._record_fetch_error(url, e, time.perf_counter() - start)
             friendly_msg = "There was an OSError or the connection failed."
             msg = f"aiohttp failure accessing feed at url:\n\t{url}"
             log.error(msg, exc_info=True)
             return None, friendly_msg
         except aiohttp.client_exceptions.ClientPayloadError as e:
+            if conditional:
+                self._record_fetch_error(url, e, time.perf_counter() - start)
             friendly_msg = "The website closed the connection prematurely or the response was malformed.\n"
             friendly_msg += f"The error returned was: `{str(e)}`\n"
             friendly_msg += "For more technical information, check your bot's console or logs."
             msg = f"content error while reading feed at url:\n\t{url}"
             log.error(msg, exc_info=True)
             return None, friendly_msg
-        except asyncio.exceptions.TimeoutError:
+        except asyncio.exceptions.TimeoutError as e:
+            if conditional:
+                self._record_fetch_error(url, e, time.perf_counter() - start)
             friendly_msg = "The bot timed out while trying to access that content."
             msg = f"asyncio timeout while accessing feed at url:\n\t{url}"
             log.error(msg, exc_info=True)
             return None, friendly_msg
-        except aiohttp.client_exceptions.ServerDisconnectedError:
+        except aiohttp.client_exceptions.ServerDisconnectedError as e:
+            if conditional:
+                self._record_fetch_error(url, e, time.perf_counter() - start)
             friendly_msg = "The target server disconnected early without a response."
             msg = f"server disconnected while accessing feed at url:\n\t{url}"
             log.error(msg, exc_info=True)
             return None, friendly_msg
-        except Exception:
+        except Exception as e:
+            if conditional:
+                self._record_fetch_error(url, e, time.perf_counter() - start)
             friendly_msg = "There was an unexpected error. Check your console for more information."
             msg = f"General failure accessing feed at url:\n\t{url}"
             log.error(msg, exc_info=True)
             return None, friendly_msg
 
-    async def _fetch_feedparser_object(self, url: str):
+    @staticmethod
+    async def _read_limited(resp: aiohttp.ClientResponse, max_size: int):
+        """
+        Helper for _get_url_content, reads a response body in chunks.
+        Returns None as soon as the body is larger than max_size bytes.
+
+        Compressed responses are decompressed by aiohttp while they are read,
+        so the limit applies to the decompressed size.
+        """
+        if resp.content_length is not None and resp.content_length > max_size:
+            return None
+        body = bytearray()
+        async for chunk in resp.content.iter_chunked(64 * 1024):
+            body += chunk
+            if len(body) > max_size:
+                return None
+        return bytes(body)
+
+    def _record_fetch_error(self, url: str, error: Exception, duration: float):
+        """Helper for _get_url_content, counts a failed feed loop fetch in the stats and the circuit breaker of its host."""
+        self._poll_stats.record_error(url, type(error).__name__, duration)
+        if isinstance(error, HOST_ERRORS):
+            self._circuit_breakers[urlparse(url).netloc].record_failure()
+
+    async def _fetch_feedparser_object(self, url: str, *, conditional: bool = False):
         """Get a full feedparser object from a url: channel header + items."""
-        html, error_msg = await self._get_url_content(url)
+        html, error_msg = await self._get_url_content(url, conditional=conditional)
+        if html is None and error_msg is None:
+            # the feed has not changed since it was last fetched by the feed loop
+            return SimpleNamespace(entries=None, error=None, not_modified=True, url=url)
         if not html:
             return SimpleNamespace(entries=None, error=error_msg, url=url)
 
-        feedparser_obj = feedparser.parse(html)
+        if conditional:
+            # many websites send no cache validators, the same bytes are parsed to the same feed
+            digest = body_digest(html)
+            if self._body_digests.get(url) == digest:
+                self._poll_stats.record_unchanged()
+                return SimpleNamespace(entries=None, error=None, not_modified=True, url=url)
+
+        parsed = await self._run_in_parser_pool(parse_feed, html)
+        parse_time = parsed.pop("parse_time")
+        if conditional:
+            self._poll_stats.record_parse(url, parse_time)
+        feedparser_obj = feedparser.util.FeedParserDict(parsed)
         if feedparser_obj.bozo:
+            if conditional:
+                self._poll_stats.record_error(url, "Bozo feed")
             error_msg = f"Bozo feed: feedparser is unable to parse the response from {url}.\n"
             error_msg += f"Feedparser error message: `{feedparser_obj.bozo_exception}`"
             return SimpleNamespace(entries=None, error=error_msg, url=url)
 
+        if conditional:
+            self._new_body_digests[url] = digest
+        self._feed_hubs[url] = find_hub(feedparser_obj.feed)
         return feedparser_obj
 
     async def _add_to_feedparser_object(self, feedparser_obj: feedparser.util.FeedParserDict, url: str):
         """
         Input: A feedparser object
-        Process: Append custom tags to the object from the custom formatters
-        Output: A feedparser object with additional attributes
+        Process: Build custom tags for the object from the custom formatters
+        Output: A ChainMap of the custom tags layered over the feedparser object
         """
         feedparser_plus_obj = await self._append_bs4_tags(feedparser_obj, url)
         feedparser_plus_obj["template_tags"] = sorted(feedparser_plus_obj.keys())
 
         return feedparser_plus_obj
 
+    async def _get_feed_snapshot(self, url: str, *, refresh: bool = False):
+        """
+        Helper for rss listtags/viewtags/force, returns the newest entry and the header of a feed url.
+        The feed is only fetched when it wasn't checked in the last few minutes or when refresh is set.
+        """
+        snapshot = None if refresh else self._feed_snapshots.get(url)
+        if snapshot is None:
+            feedparser_obj = await self._fetch_feedparser_object(url)
+            if not feedparser_obj or feedparser_obj.entries is None:
+                return None
+            entries = feedparser_obj.entries
+            if entries:
+                entries = await self._sort_by_post_time(entries, await self._uses_published(url, entries))
+            snapshot = self._set_feed_snapshot(url, feedparser_obj.feed, entries[0] if entries else None)
+        return snapshot
+
+    def _set_feed_snapshot(self, url: str, header: feedparser.util.FeedParserDict, entry):
+        snapshot = SimpleNamespace(feed=header, entry=entry, tags=None)
+        self._feed_snapshots.set(url, snapshot)
+        return snapshot
+
+    async def _get_snapshot_tags(self, url: str, *, refresh: bool = False):
+        """Helper for rss listtags/viewtags, every tag of the newest entry of a feed, built once per snapshot."""
+        snapshot = await self._get_feed_snapshot(url, refresh=refresh)
+        if snapshot is None:
+            return None
+        if snapshot.tags is None:
+            # a feed without posts still has a header with channel information
+            snapshot.tags = await self._add_to_feedparser_object(
+                snapshot.entry if snapshot.entry is not None else snapshot.feed, url
+            )
+        return snapshot.tags
+
+    async def _add_to_feedparser_object_lazily(self, feedparser_obj: feedparser.util.FeedParserDict, tag_names):
+        """
+        Input: A feedparser object and the tag names that will be used from it
+        Process: Build the custom tags in tag_names in the parser pool, other custom tags are left out
+        Output: A read-only LazyFeedEntry
+        """
+        feedparser_plus_obj = LazyFeedEntry(feedparser_obj)
+        feedparser_plus_obj.add_tags(await self._run_in_parser_pool(build_tags, feedparser_obj, tag_names))
+
+        return feedparser_plus_obj
+
     async def _convert_feedparser_to_rssfeed(
         self, feed_name: str, feedparser_plus_obj: feedparser.util.FeedParserDict, url: str
     ):
@@ -524,11 +833,12 @@ class RSS(commands.Cog):
 
         return rss_object
 
-    async def _sort_by_post_time(self, feedparser_obj: feedparser.util.FeedParserDict):
-        base_url = urlparse(feedparser_obj[0].get("link")).netloc
-        use_published_parsed_override = await self.config.use_published()
+    async def _sort_by_post_time(self, feedparser_obj: feedparser.util.FeedParserDict, use_published: bool = None):
+        if use_published is None:
+            base_url = urlparse(feedparser_obj[0].get("link")).netloc
+            use_published = base_url in (await self._get_settings())["use_published"]
 
-        if base_url in use_published_parsed_override:
+        if use_published:
             time_tag = ["published_parsed"]
         else:
             time_tag = ["updated_parsed", "published_parsed"]
@@ -543,18 +853,20 @@ class RSS(commands.Cog):
 
         return sorted_feed_by_post_time
 
-    async def _time_tag_validation(self, entry: feedparser.util.FeedParserDict):
-        """Gets a unix timestamp if it's available from a single feedparser post entry."""
+    async def _time_tag_validation(self, entry: feedparser.util.FeedParserDict, use_published: bool = None):
+        """
+        Gets a unix timestamp if it's available from a single feedparser post entry.
+        Pass use_published from _uses_published when checking every entry of a feed.
+        """
         feed_link = entry.get("link", None)
-        if feed_link:
-            base_url = urlparse(feed_link).netloc
-        else:
+        if not feed_link:
             return None
 
         # check for a feed time override, if a feed is being problematic regarding updated_parsed
         # usage (i.e. a feed entry keeps reposting with no perceived change in content)
-        use_published_parsed_override = await self.config.use_published()
-        if base_url in use_published_parsed_override:
+        if use_published is None:
+            use_published = urlparse(feed_link).netloc in (await self._get_settings())["use_published"]
+        if use_published:
             entry_time = entry.get("published_parsed", None)
         else:
             entry_time = entry.get("updated_parsed", None)
@@ -583,15 +895,32 @@ class RSS(commands.Cog):
         current_feed_link: str,
         current_feed_time: int,
     ):
-        """Updates last title and last link seen for comparison on next feed pull."""
-        async with self.config.channel(channel).feeds() as feed_data:
-            try:
-                feed_data[feed_name]["last_title"] = current_feed_title
-                feed_data[feed_name]["last_link"] = current_feed_link
-                feed_data[feed_name]["last_time"] = current_feed_time
-            except KeyError:
-                # the feed was deleted during a _get_current_feed execution
-                pass
+        """
+        Updates last title and last link seen for comparison on next feed pull.
+        The update is saved with the other updates of the channel in _flush_last_scraped.
+        """
+        self._last_scraped_updates.setdefault(channel.id, {}).setdefault(feed_name, {}).update(
+            {
+                "last_title": current_feed_title,
+                "last_link": current_feed_link,
+                "last_time": current_feed_time,
+            }
+        )
+
+    async def _flush_last_scraped(self):
+        """Saves the buffered last scraped and seen mark updates, with one config write per channel that changed."""
+        updates, self._last_scraped_updates = self._last_scraped_updates, {}
+        for channel_id, channel_updates in updates.items():
+            # holds the channel's config lock, so that a command editing the same channel isn't overwritten
+            # and config is only written when something changed
+            async with self.config.channel_from_id(channel_id).feeds() as feed_data:
+                for feed_name, last_scraped in channel_updates.items():
+                    if feed_name not in feed_data:
+                        # the feed was deleted since the update was buffered
+                        continue
+                    feed_data[feed_name].update(last_scraped)
+            if self._subscriptions is not None:
+                self._subscriptions.set_channel(channel_id, feed_data)
 
     async def _valid_url(self, url: str, feed_check=True):
         """Helper for rss add."""
@@ -608,7 +937,7 @@ class RSS(commands.Cog):
                     raise NoFeedContent(error_msg)
                     return False
 
-                rss = feedparser.parse(text)
+                rss = feedparser.util.FeedParserDict(await self._run_in_parser_pool(parse_feed, text))
                 if rss.bozo:
                     error_message = rss.feed.get("summary", str(rss))[:1500]
                     error_message = re.sub(IPV4_RE, "[REDACTED IP ADDRESS]", error_message)
@@ -626,12 +955,36 @@ class RSS(commands.Cog):
             return False
 
     async def _validate_image(self, url: str):
-        """Helper for _get_current_feed_embed."""
+        """
+        Helper for _get_current_feed_embed.
+
+        Results are cached, and posts that use an image that is being checked right now wait for that check.
+        """
+        if not isinstance(url, str):
+            return None
+        if url in self._image_types:
+            return self._image_types.get(url)
+
+        image_check = self._image_checks.get(url)
+        if image_check is None:
+            image_check = asyncio.ensure_future(self._check_image_type(url))
+            self._image_checks[url] = image_check
+            image_check.add_done_callback(lambda _: self._image_checks.pop(url, None))
+        image_type = await asyncio.shield(image_check)
+
+        # images that failed are checked again sooner, in case the website had a hiccup
+        self._image_types.set(url, image_type, ttl=None if image_type else 30 * 60)
+        return image_type
+
+    async def _check_image_type(self, url: str):
+        """Helper for _validate_image, returns the file type of an image url."""
         try:
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                async with session.get(url) as resp:
-                    image = await resp.content.read(261)
+            async with self._session.get(url) as resp:
+                # trust the content type when it's one of the image types we can use
+                content_type = resp.headers.get("Content-Type", "").split(";")[0].strip().lower()
+                if content_type in IMAGE_CONTENT_TYPES:
+                    return IMAGE_CONTENT_TYPES[content_type]
+                image = await resp.content.read(261)
             img = io.BytesIO(image)
             file_type = filetype.guess(img)
             if not file_type:
@@ -683,6 +1036,116 @@ class RSS(commands.Cog):
             else:
                 await ctx.send("Invalid or unavailable URL.")
 
+    @rss.command(name="import")
+    async def _rss_import(self, ctx, channel: Optional[GuildMessageable] = None):
+        """
+        Add the feeds from an OPML file to a channel.
+
+        Attach the OPML file to the command message, most feed readers can export their feeds as OPML.
+        Feed names are made from the titles in the file. Feeds that are already in the channel are skipped.
+        """
+        channel = channel or ctx.channel
+        channel_permission_check = await self._check_channel_permissions(ctx, channel)
+        if not channel_permission_check:
+            return
+        if not ctx.message.attachments:
+            await ctx.send("Attach an OPML file to the command message.")
+            return
+        attachment = ctx.message.attachments[0]
+        if attachment.size > MAX_OPML_SIZE:
+            await ctx.send(f"That file is too big, OPML files up to {MAX_OPML_SIZE // 1024} KB can be imported.")
+            return
+
+        try:
+            opml_feeds = parse_opml(await attachment.read())
+        except OPMLError as e:
+            await ctx.send(str(e))
+            return
+        except discord.HTTPException:
+            await ctx.send("Couldn't download that file.")
+            return
+
+        existing_feeds = await self.config.channel(channel).feeds()
+        existing_urls = {feed_data["url"] for feed_data in existing_feeds.values()}
+        names = set(existing_feeds)
+        # feed name: url
+        to_import = {}
+        skipped = 0
+        for title, url in opml_feeds:
+            if url in existing_urls:
+                skipped += 1
+                continue
+            existing_urls.add(url)
+            feed_name = base_name = feed_name_from_title(title, url)
+            number = 2
+            while feed_name in names:
+                feed_name = f"{base_name}-{number}"
+                number += 1
+            names.add(feed_name)
+            to_import[feed_name] = url
+
+        if not to_import:
+            await ctx.send(f"There are no new feeds for {channel.mention} in that file.")
+            return
+
+        settings = await self._get_settings()
+        fetch_semaphore = asyncio.Semaphore(settings["fetch_workers"])
+        host_semaphores = defaultdict(lambda: asyncio.Semaphore(settings["fetch_host_limit"]))
+        await ctx.send(f"Checking {len(to_import)} feeds, this can take a while.")
+        async with ctx.typing():
+            results = await asyncio.gather(
+                *(self._import_feed(url, fetch_semaphore, host_semaphores) for url in to_import.values())
+            )
+
+            seen_index = await self._get_seen_index()
+            new_feeds = {}
+            # url: new seen index
+            new_indexes = {}
+            failed = []
+            for (feed_name, url), result in zip(to_import.items(), results):
+                if isinstance(result, str):
+                    failed.append(f"{feed_name}  {url}\n\t{result}")
+                    continue
+                rss_object, url_index = await self._build_new_feed(feed_name, url, result)
+                new_feeds[feed_name] = rss_object.to_json()
+                if url_index is not None and url not in new_indexes:
+                    new_indexes[url] = url_index
+
+            if new_indexes:
+                seen_index.update(new_indexes)
+                async with self.config.custom("SEEN_ENTRIES").all() as all_indexes:
+                    for url, url_index in new_indexes.items():
+                        all_indexes[url] = {"index": url_index.to_json()}
+            if new_feeds:
+                async with self._edit_channel_feeds(channel) as feed_data:
+                    feed_data.update(new_feeds)
+                await self._sync_websub()
+
+        msg = f"Imported {len(new_feeds)} feeds into {channel.mention}."
+        if skipped:
+            msg += f" {skipped} feeds were already in the channel."
+        if failed:
+            msg += f" {len(failed)} feeds couldn't be added:"
+        await ctx.send(msg)
+        if failed:
+            for page in pagify("\n".join(failed), delims=["\n"], page_length=1800):
+                await ctx.send(box(page, lang="ini"))
+
+    @rss.command(name="export")
+    async def _rss_export(self, ctx, channel: Optional[GuildMessageable] = None):
+        """Export the feeds of a channel as an OPML file, for rss import or a feed reader."""
+        channel = channel or ctx.channel
+        channel_permission_check = await self._check_channel_permissions(ctx, channel, addl_send_messages_check=False)
+        if not channel_permission_check:
+            return
+
+        feeds = await self.config.channel(channel).feeds()
+        if not feeds:
+            await ctx.send("There are no feeds in this channel.")
+            return
+        opml = build_opml(f"RSS feeds for #{channel.name}", feeds)
+        await ctx.send(file=discord.File(io.BytesIO(opml), filename=f"{channel.name}-feeds.opml"))
+
     @rss.group(name="embed")
     async def _rss_embed(self, ctx):
         """Embed feed settings."""
@@ -714,7 +1177,7 @@ class RSS(commands.Cog):
             )
 
         if not color:
-            async with self.config.channel(channel).feeds() as feed_data:
+            async with self._edit_channel_feeds(channel) as feed_data:
                 feed_data[feed_name]["embed_color"] = None
             await ctx.send(
                 f"{embed_state_message}The color for {bold(feed_name)} has been reset. "
@@ -740,7 +1203,7 @@ class RSS(commands.Cog):
         if hex_code == "0xFFFFFF":
             hex_code = "0xFFFFFE"
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             # data is always a 0xFFFFFF style value
             feed_data[feed_name]["embed_color"] = hex_code
 
@@ -787,7 +1250,7 @@ class RSS(commands.Cog):
                 await ctx.send(msg)
                 return
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             feed_data[feed_name]["embed_image"] = image_tag_name
 
         if image_tag_name:
@@ -838,7 +1301,7 @@ class RSS(commands.Cog):
                 await ctx.send(msg)
                 return
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             feed_data[feed_name]["embed_thumbnail"] = thumbnail_tag_name
 
         if thumbnail_tag_name:
@@ -867,7 +1330,7 @@ class RSS(commands.Cog):
         embed_toggle = rss_feed["embed"]
         toggle_text = "disabled" if embed_toggle else "enabled"
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             feed_data[feed_name]["embed"] = not embed_toggle
 
         await ctx.send(f"Embeds for {bold(feed_name)} are {toggle_text}.")
@@ -880,31 +1343,29 @@ class RSS(commands.Cog):
         The site must have identified their feed in the html of the page based on RSS feed type standards.
         """
         async with ctx.typing():
-            timeout = aiohttp.ClientTimeout(total=20)
-            async with aiohttp.ClientSession(headers=self._headers, timeout=timeout) as session:
-                try:
-                    async with session.get(website_url) as response:
-                        soup = BeautifulSoup(await response.text(errors="replace"), "html.parser")
-                except (aiohttp.client_exceptions.ClientConnectorError, aiohttp.client_exceptions.ClientPayloadError):
-                    await ctx.send("I can't reach that website.")
-                    return
-                except aiohttp.client_exceptions.InvalidURL:
-                    await ctx.send(
-                        "That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`."
-                    )
-                    return
-                except aiohttp.client_exceptions.ServerDisconnectedError:
-                    await ctx.send("The server disconnected early without a response.")
-                    return
-                except asyncio.exceptions.TimeoutError:
-                    await ctx.send("The site didn't respond in time or there was no response.")
-                    return
-                except Exception as e:
-                    msg = "There was an issue trying to find a feed in that site. "
-                    msg += "Please check your console for more information."
-                    log.exception(e, exc_info=e)
-                    await ctx.send(msg)
-                    return
+            try:
+                async with self._session.get(website_url) as response:
+                    soup = BeautifulSoup(await response.text(errors="replace"), "html.parser")
+            except (aiohttp.client_exceptions.ClientConnectorError, aiohttp.client_exceptions.ClientPayloadError):
+                await ctx.send("I can't reach that website.")
+                return
+            except aiohttp.client_exceptions.InvalidURL:
+                await ctx.send(
+                    "That seems to be an invalid URL. Use a full website URL like `https://www.site.com/`."
+                )
+                return
+            except aiohttp.client_exceptions.ServerDisconnectedError:
+                await ctx.send("The server disconnected early without a response.")
+                return
+            except asyncio.exceptions.TimeoutError:
+                await ctx.send("The site didn't respond in time or there was no response.")
+                return
+            except Exception as e:
+                msg = "There was an issue trying to find a feed in that site. "
+                msg += "Please check your console for more information."
+                log.exception(e, exc_info=e)
+                await ctx.send(msg)
+                return
 
         if "403 Forbidden" in soup.get_text():
             await ctx.send("I received a '403 Forbidden' message while trying to reach that site.")
@@ -941,26 +1402,37 @@ class RSS(commands.Cog):
             await ctx.send("No RSS feeds found in the link provided.")
 
     @rss.command(name="force")
-    async def _rss_force(self, ctx, feed_name: str, channel: Optional[GuildMessageable] = None):
-        """Forces a feed alert."""
+    async def _rss_force(
+        self,
+        ctx,
+        feed_name: str,
+        channel: Optional[GuildMessageable] = None,
+        refresh: Optional[Literal["refresh"]] = None,
+    ):
+        """
+        Forces a feed alert.
+
+        The feed is only fetched again when it wasn't checked in the last few minutes.
+        Add `refresh` at the end to always fetch it again.
+        """
         channel = channel or ctx.channel
         channel_permission_check = await self._check_channel_permissions(ctx, channel)
         if not channel_permission_check:
             return
 
-        feeds = await self.config.all_channels()
-        try:
-            feeds[channel.id]
-        except KeyError:
-            await ctx.send("There are no feeds in this channel.")
-            return
-
-        if feed_name not in feeds[channel.id]["feeds"]:
+        rss_feed = await self.config.channel(channel).feeds.get_raw(feed_name, default=None)
+        if not rss_feed:
             await ctx.send("That feed name doesn't exist in this channel.")
             return
 
-        rss_feed = feeds[channel.id]["feeds"][feed_name]
-        await self.get_current_feed(channel, feed_name, rss_feed, force=True)
+        snapshot = await self._get_feed_snapshot(rss_feed["url"], refresh=bool(refresh))
+        if snapshot is None:
+            await ctx.send("Couldn't fetch that feed.")
+            return
+        feedparser_obj = feedparser.util.FeedParserDict(
+            feed=snapshot.feed, entries=[snapshot.entry] if snapshot.entry is not None else [], bozo=0
+        )
+        await self.get_current_feed(channel, feed_name, rss_feed, force=True, feedparser_obj=feedparser_obj)
 
     @rss.command(name="limit")
     async def _rss_limit(
@@ -998,7 +1470,7 @@ class RSS(commands.Cog):
             await ctx.send("That feed name doesn't exist in this channel.")
             return
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             feed_data[feed_name]["limit"] = character_limit
 
         characters = f"approximately {character_limit}" if character_limit > 0 else "an unlimited amount of"
@@ -1043,8 +1515,19 @@ class RSS(commands.Cog):
             await ctx.send(box(page, lang="ini"))
 
     @rss.command(name="listtags")
-    async def _rss_list_tags(self, ctx, feed_name: str, channel: Optional[GuildMessageable] = None):
-        """List the tags available from a specific feed."""
+    async def _rss_list_tags(
+        self,
+        ctx,
+        feed_name: str,
+        channel: Optional[GuildMessageable] = None,
+        refresh: Optional[Literal["refresh"]] = None,
+    ):
+        """
+        List the tags available from a specific feed.
+
+        The tags come from the newest post of the feed, which is only fetched again when it wasn't checked
+        in the last few minutes. Add `refresh` at the end to always fetch it again.
+        """
         channel = channel or ctx.channel
         channel_permission_check = await self._check_channel_permissions(ctx, channel)
         if not channel_permission_check:
@@ -1057,22 +1540,16 @@ class RSS(commands.Cog):
             return
 
         async with ctx.typing():
-            await self._rss_list_tags_helper(ctx, rss_feed, feed_name)
+            await self._rss_list_tags_helper(ctx, rss_feed, feed_name, refresh=bool(refresh))
 
-    async def _rss_list_tags_helper(self, ctx, rss_feed: dict, feed_name: str):
+    async def _rss_list_tags_helper(self, ctx, rss_feed: dict, feed_name: str, *, refresh: bool = False):
         """Helper function for rss listtags."""
         msg = f"[ Available Template Tags for {feed_name} ]\n\n\t"
-        feedparser_obj = await self._fetch_feedparser_object(rss_feed["url"])
+        feedparser_plus_obj = await self._get_snapshot_tags(rss_feed["url"], refresh=refresh)
 
-        if not feedparser_obj:
+        if not feedparser_plus_obj:
             await ctx.send("Couldn't fetch that feed.")
             return
-        if feedparser_obj.entries:
-            # this feed has posts
-            feedparser_plus_obj = await self._add_to_feedparser_object(feedparser_obj.entries[0], rss_feed["url"])
-        else:
-            # this feed does not have posts, but it has a header with channel information
-            feedparser_plus_obj = await self._add_to_feedparser_object(feedparser_obj.feed, rss_feed["url"])
 
         for tag_name, tag_content in sorted(feedparser_plus_obj.items()):
             if tag_name in INTERNAL_TAGS:
@@ -1131,6 +1608,8 @@ class RSS(commands.Cog):
         else:
             override_list.append(website)
             await self.config.use_published.set(override_list)
+            await self._clear_seen_index(website)
+            self._clear_settings_cache()
             await ctx.send(f"`{website}` was added to the parsing override list.")
 
     @_rss_parse.command(name="list")
@@ -1160,6 +1639,8 @@ class RSS(commands.Cog):
         if website in override_list:
             override_list.remove(website)
             await self.config.use_published.set(override_list)
+            await self._clear_seen_index(website)
+            self._clear_settings_cache()
             await ctx.send(f"`{website}` was removed from the parsing override list.")
         else:
             await ctx.send(f"`{website}` isn't in the parsing override list.")
@@ -1182,6 +1663,224 @@ class RSS(commands.Cog):
         else:
             await ctx.send("Feed not found!")
 
+    @checks.is_owner()
+    @rss.group(name="settings")
+    async def _rss_settings(self, ctx):
+        """
+        Global feed loop settings.
+
+        These settings apply to all feeds on the bot.
+        """
+        pass
+
+    @_rss_settings.command(name="hostlimit")
+    async def _rss_settings_hostlimit(self, ctx, limit: int = None):
+        """
+        Set how many feeds on the same website can be fetched at the same time.
+
+        Use this command with no limit to show the current setting.
+        """
+        if limit is None:
+            limit = await self.config.fetch_host_limit()
+            await ctx.send(f"Up to {limit} feeds per website are fetched at the same time.")
+            return
+        if not 1 <= limit <= 20:
+            await ctx.send("The per-website limit must be between 1 and 20.")
+            return
+
+        await self.config.fetch_host_limit.set(limit)
+        self._clear_settings_cache()
+        await ctx.send(f"Up to {limit} feeds per website will be fetched at the same time.")
+
+    @_rss_settings.command(name="interval")
+    async def _rss_settings_interval(self, ctx, minimum: int = None, maximum: int = None):
+        """
+        Set how often feeds are checked, in minutes.
+
+        Feeds are checked every `minimum` minutes while they post often. Feeds that have no new posts
+        are checked less often each time, up to once every `maximum` minutes. Feeds that ask to be
+        checked less often through their cache headers or update period are checked less often too.
+        Use this command with no values to show the current setting.
+        """
+        if minimum is None:
+            minimum = await self.config.poll_min_interval() // 60
+            maximum = await self.config.poll_max_interval() // 60
+            await ctx.send(f"Feeds are checked every {minimum} to {maximum} minutes.")
+            return
+        maximum = maximum or max(minimum, await self.config.poll_max_interval() // 60)
+        if not 1 <= minimum <= 60:
+            await ctx.send("The minimum interval must be between 1 and 60 minutes.")
+            return
+        if not minimum <= maximum <= 1440:
+            await ctx.send("The maximum interval must be between the minimum interval and 1440 minutes.")
+            return
+
+        await self.config.poll_min_interval.set(minimum * 60)
+        await self.config.poll_max_interval.set(maximum * 60)
+        self._clear_settings_cache()
+        await ctx.send(f"Feeds will be checked every {minimum} to {maximum} minutes.")
+
+    @_rss_settings.command(name="maxsize")
+    async def _rss_settings_maxsize(self, ctx, megabytes: float = None):
+        """
+        Set the largest feed that will be downloaded, in megabytes.
+
+        Downloads stop as soon as a feed gets larger than this, so that a bad url can't use up the bot's memory.
+        Use this command with no size to show the current setting.
+        """
+        if megabytes is None:
+            max_size = await self.config.max_feed_size()
+            await ctx.send(f"Feeds larger than {max_size / 1024 / 1024:.4g} MB are not downloaded.")
+            return
+        if not 0.1 <= megabytes <= 100:
+            await ctx.send("The maximum feed size must be between 0.1 and 100 megabytes.")
+            return
+
+        max_size = int(megabytes * 1024 * 1024)
+        await self.config.max_feed_size.set(max_size)
+        self._clear_settings_cache()
+        await ctx.send(f"Feeds larger than {max_size / 1024 / 1024:.4g} MB will not be downloaded.")
+
+    @_rss_settings.command(name="parser")
+    async def _rss_settings_parser(self, ctx, pool_type: str = None, workers: int = None):
+        """
+        Set where feeds are parsed and feed tags are built.
+
+        `pool_type` can be `thread` or `process`. A process pool keeps large feeds from slowing down
+        the whole bot but uses more memory. Its workers are new Python processes that import the cog
+        on their own, so the first feeds take a few seconds longer to parse after the pool starts.
+        Use this command with no pool type to show the current setting.
+        """
+        if pool_type is None:
+            pool_type = await self.config.parser_pool()
+            workers = await self.config.parser_workers()
+            await ctx.send(f"Feeds are parsed in a {pool_type} pool with {workers} workers.")
+            return
+        pool_type = pool_type.lower()
+        if pool_type not in ("thread", "process"):
+            await ctx.send("The pool type must be `thread` or `process`.")
+            return
+        workers = workers or await self.config.parser_workers()
+        if not 1 <= workers <= 16:
+            await ctx.send("The amount of parser workers must be between 1 and 16.")
+            return
+
+        await self.config.parser_pool.set(pool_type)
+        await self.config.parser_workers.set(workers)
+        self._clear_settings_cache()
+        if self._parser_pool:
+            # running parse jobs finish in the old pool, new ones go to the new pool
+            self._parser_pool.shutdown(wait=False)
+            self._parser_pool = None
+        await ctx.send(f"Feeds will be parsed in a {pool_type} pool with {workers} workers.")
+
+    @_rss_settings.command(name="sharding")
+    async def _rss_settings_sharding(self, ctx, *, database_path: str = None):
+        """
+        Share feed fetching between several bots on the same machine.
+
+        Give every bot the same database path, for example `/home/red/rss_shards.db`, and each feed url
+        is fetched and parsed by only one of them. Every bot still posts to its own channels.
+        The folder must only be writable by the user the bots run as.
+        Use `off` to turn sharding off, or use this command with no path to show the current setting.
+        """
+        if database_path is None:
+            database_path = await self.config.shard_db()
+            if database_path:
+                await ctx.send(f"Feed fetching is shared through `{database_path}`.")
+            else:
+                await ctx.send("Feed fetching is not shared with other bots.")
+            return
+        if database_path.lower() == "off":
+            await self.config.shard_db.set(None)
+            self._clear_settings_cache()
+            await ctx.send("Feed fetching will not be shared with other bots anymore.")
+            return
+
+        database_path = os.path.abspath(os.path.expanduser(database_path))
+        if not os.path.isdir(os.path.dirname(database_path)):
+            await ctx.send("The folder for that database doesn't exist.")
+            return
+
+        await self.config.shard_db.set(database_path)
+        self._clear_settings_cache()
+        await ctx.send(f"Feed fetching will be shared with the other bots using `{database_path}`.")
+
+    @_rss_settings.command(name="websub")
+    async def _rss_settings_websub(self, ctx, callback_url: str = None, port: int = 8790, host: str = "127.0.0.1"):
+        """
+        Let websites push new posts through WebSub instead of waiting for the next check.
+
+        The bot runs a small web server on `host` and `port`, which must be reachable from the internet
+        at `callback_url`, usually through a reverse proxy. Feeds that name a WebSub hub, like YouTube channels,
+        are subscribed to through their hub and are only polled at the longest poll interval in case a post is missed.
+        Use `off` to turn push mode off, or use this command with no url to show the current setting.
+        """
+        if callback_url is None:
+            settings = await self._get_settings()
+            if not settings["websub_url"]:
+                await ctx.send("Push mode is off, all feeds are polled.")
+                return
+            running = "running" if self._websub_receiver else "not running, check the logs"
+            await ctx.send(
+                f"Push mode is on with callbacks at <{settings['websub_url']}>, the receiver on "
+                f"{settings['websub_host']}:{settings['websub_port']} is {running}."
+            )
+            return
+        if callback_url.lower() == "off":
+            await self.config.websub_url.set(None)
+            self._clear_settings_cache()
+            await self._stop_websub()
+            await self._clear_websub()
+            await ctx.send("Push mode is off, all feeds will be polled. Hub subscriptions will run out on their own.")
+            return
+
+        callback_url = callback_url.strip("<>")
+        result = urlparse(callback_url)
+        if result.scheme not in ("http", "https") or not result.netloc:
+            await ctx.send("The callback url must be a full http or https url.")
+            return
+        if not 1 <= port <= 65535:
+            await ctx.send("The port must be between 1 and 65535.")
+            return
+
+        # subscriptions made for another callback url are replaced on the next feed loop cycle
+        await self.config.websub_url.set(callback_url)
+        await self.config.websub_host.set(host)
+        await self.config.websub_port.set(port)
+        self._clear_settings_cache()
+        await self._stop_websub()
+        await self._clear_websub()
+        await self._start_websub()
+        if not self._websub_receiver:
+            await ctx.send(f"Couldn't start the receiver on {host}:{port}, check the logs.")
+            return
+        await self._sync_websub()
+        await ctx.send(
+            f"Push mode is on, hubs will call back to <{callback_url}> which must reach {host}:{port}. "
+            "Feeds with a hub are subscribed to once they were checked since the cog was loaded."
+        )
+
+    @_rss_settings.command(name="workers")
+    async def _rss_settings_workers(self, ctx, workers: int = None):
+        """
+        Set how many feeds can be fetched at the same time.
+
+        More workers let the bot keep up with a large amount of feeds.
+        Use this command with no amount to show the current setting.
+        """
+        if workers is None:
+            workers = await self.config.fetch_workers()
+            await ctx.send(f"Up to {workers} feeds are fetched at the same time.")
+            return
+        if not 1 <= workers <= 100:
+            await ctx.send("The amount of workers must be between 1 and 100.")
+            return
+
+        await self.config.fetch_workers.set(workers)
+        self._clear_settings_cache()
+        await ctx.send(f"Up to {workers} feeds will be fetched at the same time.")
+
     @rss.command(name="showtemplate")
     async def _rss_show_template(self, ctx, feed_name: str, channel: Optional[GuildMessageable] = None):
         """Show the template in use for a specific feed."""
@@ -1239,6 +1938,76 @@ class RSS(commands.Cog):
         for page in pagify(msg, delims=["\n"], page_length=1800):
             await ctx.send(page)
 
+    @checks.is_owner()
+    @rss.command(name="stats")
+    async def _rss_stats(self, ctx, top: int = 5):
+        """
+        Show how the feed loop is doing.
+
+        Use this to see if the feed loop keeps up with the feeds on the bot and which feeds take the most time.
+        `top` is how many of the slowest feeds to show, up to 20.
+        """
+        stats = self.get_stats(top=max(1, min(top, 20)))
+        settings = await self._get_settings()
+
+        last_cycle = stats["last_cycle"]
+        msg = "[ RSS Feed Loop Stats ]\n\n"
+        if last_cycle:
+            behind = " (behind)" if last_cycle["duration"] > settings["poll_min_interval"] else ""
+            msg += f"Last cycle:          {last_cycle['duration']:.2f}s{behind}\n"
+            msg += f"Average cycle:       {stats['cycle_duration']['average']:.2f}s\n"
+            msg += f"Longest cycle:       {stats['cycle_duration']['max']:.2f}s\n"
+            msg += f"Queued feeds:        {last_cycle['queued']}\n"
+            msg += f"Fetched urls:        {last_cycle['fetched']}\n"
+        else:
+            msg += "No feed loop cycle has finished yet.\n"
+
+        not_modified_ratio = stats["not_modified_ratio"]
+        msg += f"\nFetches:             {stats['fetches']}\n"
+        msg += f"Not modified (304):  {f'{not_modified_ratio:.1%}' if not_modified_ratio is not None else 'n/a'}\n"
+        unchanged_ratio = stats["unchanged_ratio"]
+        msg += f"Same body as before: {f'{unchanged_ratio:.1%}' if unchanged_ratio is not None else 'n/a'}\n"
+        msg += f"Downloaded:          {stats['bytes_downloaded'] / 1024 / 1024:.2f} MiB\n"
+        average_parse = stats["parse_time"] / stats["parses"] if stats["parses"] else 0
+        msg += f"Parse time:          {stats['parse_time']:.2f}s total, {average_parse * 1000:.1f}ms average\n"
+
+        connections = stats["connections"]
+        total = connections["created"] + connections["reused"]
+        reuse_rate = f"{connections['reused'] / total:.1%}" if total else "n/a"
+        msg += f"Connections opened:  {connections['created']}\n"
+        msg += f"Connections reused:  {connections['reused']} ({reuse_rate})\n"
+        msg += f"Posts waiting:       {stats['outbox']['posts']} in {stats['outbox']['channels']} channels\n"
+        websub = stats["websub"]
+        if websub["enabled"]:
+            msg += f"Push subscriptions:  {websub['active']} active of {websub['subscriptions']}\n"
+        if stats["sharding"]:
+            sharding = stats["sharding"]
+            msg += f"Shards owned:        {sharding['owned_shards']} of {sharding['shards']} ({sharding['worker_id']})\n"
+
+        if stats["errors"]:
+            msg += "\n[ Errors ]\n"
+            for error, count in sorted(stats["errors"].items(), key=lambda item: item[1], reverse=True):
+                msg += f"{error}: {count}\n"
+
+        if stats["failing_hosts"]:
+            msg += "\n[ Failing websites ]\n"
+            for host, retry_in in stats["failing_hosts"].items():
+                msg += f"{host}: retrying in {humanize_timedelta(seconds=retry_in) or 'a moment'}\n"
+
+        if stats["host_latency"]:
+            msg += "\n[ Fetch latency per host (p50 / p90 / p99) ]\n"
+            for host, latency in sorted(stats["host_latency"].items(), key=lambda item: item[1]["p90"], reverse=True):
+                p50, p90, p99 = (latency[key] * 1000 for key in ("p50", "p90", "p99"))
+                msg += f"{host}: {p50:.0f}ms / {p90:.0f}ms / {p99:.0f}ms\n"
+
+        if stats["slowest_feeds"]:
+            msg += "\n[ Slowest feeds ]\n"
+            for url, seconds in stats["slowest_feeds"]:
+                msg += f"{seconds:.2f}s {url}\n"
+
+        for page in pagify(msg, delims=["\n"], page_length=1800):
+            await ctx.send(box(page, lang="ini"))
+
     @rss.group(name="tag")
     async def _rss_tag(self, ctx):
         """RSS post tag qualification."""
@@ -1258,7 +2027,7 @@ class RSS(commands.Cog):
             await ctx.send("That feed name doesn't exist in this channel.")
             return
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             allowed_tags = feed_data[feed_name].get("allowed_tags", [])
             if tag.lower() in [x.lower() for x in allowed_tags]:
                 return await ctx.send(
@@ -1307,7 +2076,7 @@ class RSS(commands.Cog):
             await ctx.send("That feed name doesn't exist in this channel.")
             return
 
-        async with self.config.channel(channel).feeds() as feed_data:
+        async with self._edit_channel_feeds(channel) as feed_data:
             allowed_tags = feed_data[feed_name].get("allowed_tags", [])
             try:
                 allowed_tags.remove(tag.lower())
@@ -1345,8 +2114,19 @@ class RSS(commands.Cog):
             await ctx.send("Feed not found!")
 
     @rss.command(name="viewtags")
-    async def _rss_view_tags(self, ctx, feed_name: str, channel: Optional[GuildMessageable] = None):
-        """View a preview of template tag content available from a specific feed."""
+    async def _rss_view_tags(
+        self,
+        ctx,
+        feed_name: str,
+        channel: Optional[GuildMessageable] = None,
+        refresh: Optional[Literal["refresh"]] = None,
+    ):
+        """
+        View a preview of template tag content available from a specific feed.
+
+        The tags come from the newest post of the feed, which is only fetched again when it wasn't checked
+        in the last few minutes. Add `refresh` at the end to always fetch it again.
+        """
         channel = channel or ctx.channel
         channel_permission_check = await self._check_channel_permissions(ctx, channel)
         if not channel_permission_check:
@@ -1359,24 +2139,18 @@ class RSS(commands.Cog):
             return
 
         async with ctx.typing():
-            await self._rss_view_tags_helper(ctx, rss_feed, feed_name)
+            await self._rss_view_tags_helper(ctx, rss_feed, feed_name, refresh=bool(refresh))
 
-    async def _rss_view_tags_helper(self, ctx, rss_feed: dict, feed_name: str):
+    async def _rss_view_tags_helper(self, ctx, rss_feed: dict, feed_name: str, *, refresh: bool = False):
         """Helper function for rss viewtags."""
         blue_ansi_prefix = "\u001b[1;40;34m"
         reset_ansi_prefix = "\u001b[0m"
         msg = f"{blue_ansi_prefix}[ Template Tag Content Preview for {feed_name} ]{reset_ansi_prefix}\n\n\t"
-        feedparser_obj = await self._fetch_feedparser_object(rss_feed["url"])
+        feedparser_plus_obj = await self._get_snapshot_tags(rss_feed["url"], refresh=refresh)
 
-        if not feedparser_obj:
+        if not feedparser_plus_obj:
             await ctx.send("Couldn't fetch that feed.")
             return
-        if feedparser_obj.entries:
-            # this feed has posts
-            feedparser_plus_obj = await self._add_to_feedparser_object(feedparser_obj.entries[0], rss_feed["url"])
-        else:
-            # this feed does not have posts, but it has a header with channel information
-            feedparser_plus_obj = await self._add_to_feedparser_object(feedparser_obj.feed, rss_feed["url"])
 
         longest_key = max(feedparser_plus_obj, key=len)
         longest_key_len = len(longest_key)
@@ -1404,8 +2178,20 @@ class RSS(commands.Cog):
         """Show the RSS version."""
         await ctx.send(f"RSS version {__version__}")
 
-    async def get_current_feed(self, channel: GuildMessageable, name: str, rss_feed: dict, *, force: bool = False):
-        """Takes an RSS feed and builds an object with all extra tags"""
+    async def get_current_feed(
+        self,
+        channel: GuildMessageable,
+        name: str,
+        rss_feed: dict,
+        *,
+        force: bool = False,
+        feedparser_obj: Optional[feedparser.util.FeedParserDict] = None,
+    ):
+        """
+        Takes an RSS feed and builds an object with all extra tags
+
+        The feed is fetched here unless the feed loop passes in an already fetched feedparser_obj.
+        """
         log.debug(f"getting feed {name} on cid {channel.id}")
         url = rss_feed["url"]
         last_title = rss_feed["last_title"]
@@ -1413,12 +2199,30 @@ class RSS(commands.Cog):
         last_link = rss_feed.get("last_link", None)
         # last_time is a get for feeds saved before RSS 1.1.7 which won't have this attrib till it's checked once
         last_time = rss_feed.get("last_time", None)
+        # position in the seen index that this channel feed caught up to, None for feeds saved before RSS 2.2.0
+        seen_mark = rss_feed.get("seen_mark", None)
         template = rss_feed["template"]
         message = None
 
-        feedparser_obj = await self._fetch_feedparser_object(url)
+        # only the custom tags that a post from this feed uses are built, unless other cogs listen to the feed events
+        has_listeners = any(self.bot.extra_events.get(f"on_{event}") for event in FEED_EVENTS)
+        used_tags = set(compile_template(template).identifiers())
+        used_tags.update(tag for tag in (rss_feed.get("embed_image"), rss_feed.get("embed_thumbnail")) if tag)
+        used_tags.update(["updated_parsed_datetime", "published_parsed_datetime"])
+        if rss_feed.get("allowed_tags", []):
+            used_tags.add("tags_list")
+
+        if feedparser_obj is None:
+            feedparser_obj = await self._fetch_feedparser_object(url)
         if not feedparser_obj:
             return
+        if getattr(feedparser_obj, "not_modified", False):
+            log.debug(f"Feed {name} on cid {channel.id} was not modified since the last check")
+            snapshot = self._feed_snapshots.get(url)
+            if snapshot is not None:
+                # the feed is still the same, so is its snapshot
+                self._feed_snapshots.set(url, snapshot)
+            return
         try:
             log.debug(f"{feedparser_obj.error} Channel: {channel.id}")
             return
@@ -1428,16 +2232,36 @@ class RSS(commands.Cog):
         # sorting the entire feedparser object by updated_parsed time if it exists, if not then published_parsed
         # certain feeds can be rearranged by a user, causing all posts to be out of sequential post order
         # or some feeds are out of time order by default
+        use_published = await self._uses_published(url, feedparser_obj.entries)
         if feedparser_obj.entries:
             # this feed has posts
-            sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries)
+            sorted_feed_by_post_time = await self._sort_by_post_time(feedparser_obj.entries, use_published)
         else:
             # this feed does not have posts, but it has a header with channel information
             sorted_feed_by_post_time = [feedparser_obj.feed]
+        if not force:
+            # keep the newest entry around for rss listtags/viewtags/force
+            self._set_feed_snapshot(
+                url, feedparser_obj.feed, sorted_feed_by_post_time[0] if feedparser_obj.entries else None
+            )
+
+        # find the updated_parsed (checked first) or an published_parsed tag if they are present
+        entry_times = [await self._time_tag_validation(entry, use_published) for entry in sorted_feed_by_post_time]
+        entry_ids = [entry_fingerprint(entry, entry_time) for entry, entry_time in zip(sorted_feed_by_post_time, entry_times)]
+        seen_index = None
 
         if not force:
-            entry_time = await self._time_tag_validation(sorted_feed_by_post_time[0])
-            if (last_time and entry_time) is not None:
+            # cheap identity check before anything else: nothing to do if every entry was seen before
+            seen_index = (await self._get_seen_index()).get(url, None)
+            self._seen_updates[url] = entry_ids
+            self._seen_readers.setdefault(url, set()).add((channel.id, name))
+            if seen_index is not None and all(seen_index.seen(entry_id, seen_mark) for entry_id in entry_ids):
+                log.debug(f"Up to date on {name} on cid {channel.id}, all entries were seen before")
+                return
+
+            entry_time = entry_times[0]
+            # without a seen index (feeds saved before RSS 2.2.0) the last title/link/time are compared
+            if seen_index is None and (last_time and entry_time) is not None:
                 if last_time > entry_time:
                     log.debug("Not posting because new entry is older than last saved entry.")
                     return
@@ -1451,75 +2275,81 @@ class RSS(commands.Cog):
                 link = ""
             await self._update_last_scraped(channel, name, title, link, entry_time)
 
-        feedparser_plus_objects = []
-        for entry in sorted_feed_by_post_time:
-            # sometimes there's no title or no link attribute and feedparser doesn't really play nice with that
-            try:
-                entry_title = entry.title
-            except AttributeError:
-                entry_title = ""
-            try:
-                entry_link = entry.link
-            except AttributeError:
-                entry_link = ""
+        new_entries = []
+        if seen_index is not None:
+            # every entry that this channel feed didn't see before is new
+            for entry, entry_id in zip(sorted_feed_by_post_time, entry_ids):
+                if not seen_index.seen(entry_id, seen_mark):
+                    new_entries.append(entry)
+            log.debug(f"{len(new_entries)} new entries found via the seen index for feed {name} on cid {channel.id}")
+        else:
+            for entry, entry_time in zip(sorted_feed_by_post_time, entry_times):
+                # sometimes there's no title or no link attribute and feedparser doesn't really play nice with that
+                try:
+                    entry_title = entry.title
+                except AttributeError:
+                    entry_title = ""
+                try:
+                    entry_link = entry.link
+                except AttributeError:
+                    entry_link = ""
 
-            # find the updated_parsed (checked first) or an published_parsed tag if they are present
-            entry_time = await self._time_tag_validation(entry)
+                # we only need one feed entry if this is from rss force
+                if force:
+                    new_entries.append(entry)
+                    break
 
-            # we only need one feed entry if this is from rss force
-            if force:
-                feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                feedparser_plus_objects.append(feedparser_plus_obj)
-                break
+                # TODO: spammy debug logs to vvv
 
-            # TODO: spammy debug logs to vvv
-
-            # there's a post time to compare
-            elif (entry_time and last_time) is not None:
-                # this is a post with an updated time with the same link and title, maybe an edited post.
-                # if a feed is spamming updated times with no content update, consider adding the full website
-                # (www.website.com) to the rss parse command
-                if (last_title == entry_title) and (last_link == entry_link) and (last_time < entry_time):
-                    log.debug(f"New update found for an existing post in {name} on cid {channel.id}")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
-                else:
-                    # a post from the future, or we are caught up
-                    if last_time >= entry_time:
-                        log.debug(f"Up to date on {name} on cid {channel.id}")
+                # there's a post time to compare
+                elif (entry_time and last_time) is not None:
+                    # this is a post with an updated time with the same link and title, maybe an edited post.
+                    # if a feed is spamming updated times with no content update, consider adding the full website
+                    # (www.website.com) to the rss parse command
+                    if (last_title == entry_title) and (last_link == entry_link) and (last_time < entry_time):
+                        log.debug(f"New update found for an existing post in {name} on cid {channel.id}")
+                        new_entries.append(entry)
+                    else:
+                        # a post from the future, or we are caught up
+                        if last_time >= entry_time:
+                            log.debug(f"Up to date on {name} on cid {channel.id}")
+                            break
+
+                        # a new post
+                        if last_link != entry_link:
+                            log.debug(f"New entry found via time and link validation for feed {name} on cid {channel.id}")
+                            new_entries.append(entry)
+
+                        else:
+                            # I don't belive this ever should be hit but this is a catch to debug
+                            # a feed in case one ever appears that does this
+                            log.debug(
+                                f"*** This post qualified via timestamp check but has the same link as last: {entry_title[:25]} | {entry_link}"
+                            )
+
+                # this is a post that has no time comparison information because one or both timestamps are None.
+                # compare the title and link to see if it's the same post as previous.
+                # this may need more definition in the future if there is a feed that provides new titles but not new links etc
+                elif entry_time is None or last_time is None:
+                    if last_title == entry_title and last_link == entry_link:
+                        log.debug(f"Up to date on {name} on {channel.id} via link match, no time to compare")
                         break
-
-                    # a new post
-                    if last_link != entry_link:
-                        log.debug(f"New entry found via time and link validation for feed {name} on cid {channel.id}")
-                        feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                        feedparser_plus_objects.append(feedparser_plus_obj)
-
                     else:
-                        # I don't belive this ever should be hit but this is a catch to debug
-                        # a feed in case one ever appears that does this
-                        log.debug(
-                            f"*** This post qualified via timestamp check but has the same link as last: {entry_title[:25]} | {entry_link}"
-                        )
-
-            # this is a post that has no time comparison information because one or both timestamps are None.
-            # compare the title and link to see if it's the same post as previous.
-            # this may need more definition in the future if there is a feed that provides new titles but not new links etc
-            elif entry_time is None or last_time is None:
-                if last_title == entry_title and last_link == entry_link:
-                    log.debug(f"Up to date on {name} on {channel.id} via link match, no time to compare")
-                    break
+                        log.debug(f"New entry found for feed {name} on cid {channel.id} via new link or title")
+                        new_entries.append(entry)
+
+                # we found a match for a previous feed post
                 else:
-                    log.debug(f"New entry found for feed {name} on cid {channel.id} via new link or title")
-                    feedparser_plus_obj = await self._add_to_feedparser_object(entry, url)
-                    feedparser_plus_objects.append(feedparser_plus_obj)
+                    log.debug(
+                        f"Breaking rss entry loop for {name} on {channel.id}, we found where we are supposed to be caught up to"
+                    )
+                    break
 
-            # we found a match for a previous feed post
-            else:
-                log.debug(
-                    f"Breaking rss entry loop for {name} on {channel.id}, we found where we are supposed to be caught up to"
-                )
-                break
+        # only new entries get their tags built
+        feedparser_plus_objects = []
+        for entry in new_entries:
+            feedparser_plus_obj = await self._add_to_feedparser_object_lazily(entry, used_tags)
+            feedparser_plus_objects.append(feedparser_plus_obj)
 
         #  TODO: just going to keep this here for now in case something explodes later
 
@@ -1538,16 +2368,10 @@ class RSS(commands.Cog):
         # list of feedparser_plus_objects wrapped in MappingProxyType
         # filled during the loop below
         proxied_dicts = []
+        # outbox posts for every entry, they are sent by the channel's outbox sender
+        posts = []
 
         for feedparser_plus_obj in feedparser_plus_objects:
-            try:
-                curr_title = feedparser_plus_obj.title
-            except AttributeError:
-                curr_title = ""
-            except IndexError:
-                log.debug(f"No entries found for feed {name} on cid {channel.id}")
-                return
-
             # allowed tag verification section
             allowed_tags = rss_feed.get("allowed_tags", [])
             if len(allowed_tags) > 0:
@@ -1561,14 +2385,15 @@ class RSS(commands.Cog):
                     continue
 
             # starting to fill out the template for feeds that passed tag verification (if present)
-            to_fill = QuietTemplate(template)
-            message = to_fill.quiet_safe_substitute(name=bold(name), **feedparser_plus_obj)
+            to_fill = compile_template(template)
+            message = to_fill.quiet_safe_substitute(feedparser_plus_obj, name=bold(name))
 
             if len(message.strip(" ")) == 0:
                 message = None
 
             if not message:
                 log.debug(f"{name} feed in {channel.name} ({channel.id}) has no valid tags, not posting anything.")
+                await self._queue_posts(channel, posts)
                 return
 
             embed_toggle = rss_feed["embed"]
@@ -1580,10 +2405,10 @@ class RSS(commands.Cog):
                 message = list(pagify(message, delims=["\n", " "], priority=True, page_length=(rss_limit + 8)))[0]
 
             if embed_toggle and red_embed_settings:
-                await self._get_current_feed_embed(channel, rss_feed, feedparser_plus_obj, message)
+                embeds = await self._get_current_feed_embed(channel, rss_feed, feedparser_plus_obj, message)
+                posts.extend(embed_post(embed) for embed in embeds)
             else:
-                for page in pagify(message, delims=["\n"]):
-                    await channel.send(page)
+                posts.extend(text_post(page) for page in pagify(message, delims=["\n"]))
 
             # This event can be used in 3rd-party using listeners.
             # This may (and most likely will) get changes in the future
@@ -1601,6 +2426,10 @@ class RSS(commands.Cog):
             #     See documentation of feedparser.FeedParserDict for more information.
             # force: bool
             #     True if the update was forced (through `[p]rss force`), False otherwise.
+            if has_listeners and not feedparser_plus_obj.complete:
+                # listeners get every tag, built in the parser pool before they see the entry
+                full_tags = await self._run_in_parser_pool(build_tags, feedparser_plus_obj.entry)
+                feedparser_plus_obj.add_tags(full_tags, complete=True)
             feedparser_dict_proxy = MappingProxyType(feedparser_plus_obj)
             proxied_dicts.append(feedparser_dict_proxy)
             self.bot.dispatch(
@@ -1611,6 +2440,8 @@ class RSS(commands.Cog):
                 force=force,
             )
 
+        await self._queue_posts(channel, posts)
+
         # This event can be used in 3rd-party using listeners.
         # This may (and most likely will) get changes in the future
         # so I suggest accepting **kwargs in the listeners using this event.
@@ -1640,9 +2471,10 @@ class RSS(commands.Cog):
         self,
         channel: GuildMessageable,
         rss_feed: dict,
-        feedparser_plus_obj: feedparser.util.FeedParserDict,
+        feedparser_plus_obj: Mapping,
         message: str,
     ):
+        """Returns the embeds for one feed post, the post is split over several embeds if it is too long."""
         embed_list = []
         for page in pagify(message, delims=["\n"]):
             embed = discord.Embed(description=page)
@@ -1652,7 +2484,7 @@ class RSS(commands.Cog):
             embed_list.append(embed)
 
         if len(embed_list) == 0:
-            return
+            return embed_list
 
         # Add published timestamp to the last footer if it exists
         time_tags = ["updated_parsed_datetime", "published_parsed_datetime"]
@@ -1687,90 +2519,606 @@ class RSS(commands.Cog):
         except KeyError:
             pass
 
-        for embed in embed_list:
-            await channel.send(embed=embed)
+        return embed_list
+
+    async def _get_outbox(self):
+        """Returns the posts waiting to be sent per channel id, loading them from config the first time."""
+        if self._outbox is None:
+            all_outboxes = await self.config.custom("OUTBOX").all()
+            self._outbox = {
+                int(channel_id): data["posts"] for channel_id, data in all_outboxes.items() if data.get("posts")
+            }
+        return self._outbox
+
+    async def _save_outbox(self):
+        """
+        Saves the posts that are still waiting to be sent, with one config write for all channels.
+
+        The outbox is saved once per feed loop cycle or push and when the cog is unloaded, always before
+        the seen entries. If the bot stops without unloading the cog, posts queued since the last save
+        are found again because their entries weren't marked as seen yet, and posts sent since then are sent twice.
+        """
+        if self._outbox is None:
+            return
+        for channel_id in [channel_id for channel_id, posts in self._outbox.items() if not posts]:
+            del self._outbox[channel_id]
+        # config only writes when the outbox changed since the last save
+        async with self.config.custom("OUTBOX").all() as all_outboxes:
+            all_outboxes.clear()
+            for channel_id, posts in self._outbox.items():
+                all_outboxes[str(channel_id)] = {"posts": list(posts)}
+
+    async def _queue_posts(self, channel: GuildMessageable, posts: list):
+        """Adds posts to the outbox of a channel and starts its sender, the feed loop doesn't wait for them to be sent."""
+        if not posts:
+            return
+        outbox = await self._get_outbox()
+        outbox.setdefault(channel.id, []).extend(posts)
+        self._start_outbox_sender(channel.id)
+
+    def _resume_outbox_senders(self):
+        """Starts the senders of every channel that still has posts waiting, for example after they had to stop."""
+        for channel_id, posts in self._outbox.items():
+            if posts:
+                self._start_outbox_sender(channel_id)
+
+    def _start_outbox_sender(self, channel_id: int):
+        sender = self._outbox_senders.get(channel_id)
+        if sender is None or sender.done():
+            self._outbox_senders[channel_id] = asyncio.create_task(self._send_outbox(channel_id))
+
+    async def _send_outbox(self, channel_id: int):
+        """
+        Sends the posts in the outbox of a channel in order until it is empty.
+
+        Each channel has its own sender, so a channel that is being rate limited doesn't hold up the others.
+        discord.py waits out rate limits itself. Posts are only dropped when Discord refuses them or the channel
+        is gone, other errors are retried a few times and then again after the next feed loop cycle.
+        A post is removed from the outbox once it was sent, the outbox is saved in _save_outbox.
+        """
+        channel = None
+        retries = 0
+        while True:
+            posts = self._outbox.get(channel_id)
+            if not posts:
+                return
+            channel = channel or await self._get_channel_object(channel_id)
+            if channel is None:
+                if channel_id in (await self._get_subscriptions()).channels:
+                    # missing permissions or a channel that isn't cached right now, tried again after the next cycle
+                    log.debug(f"Can't post in cid {channel_id} right now, keeping {len(posts)} queued posts")
+                    return
+                # the channel was deleted or the bot left its server
+                log.info(f"Cid {channel_id} is gone, dropping {len(posts)} queued posts")
+                posts.clear()
+                continue
+
+            count = next_batch(posts)
+            error = None
+            try:
+                await self._send_posts(channel, posts[:count])
+            except discord.errors.NotFound as e:
+                log.info(f"Cid {channel_id} was deleted, dropping {len(posts)} queued posts", exc_info=e)
+                count = len(posts)
+            except discord.errors.Forbidden as e:
+                if not can_user_send_messages_in(channel.guild.me, channel):
+                    log.debug(f"Can't post in cid {channel_id} right now, keeping {len(posts)} queued posts")
+                    return
+                log.error(f"Discord refused a feed post for cid {channel_id}, dropping it", exc_info=e)
+            except discord.errors.HTTPException as e:
+                if e.status >= 500 or e.status == 429:
+                    error = e
+                else:
+                    # sending the same post again would be refused again
+                    log.error(f"Discord didn't accept a feed post for cid {channel_id}, dropping it", exc_info=e)
+            except Exception as e:
+                error = e
+
+            if error is not None:
+                if retries < 5:
+                    retries += 1
+                    await asyncio.sleep(2**retries)
+                    continue
+                log.error(
+                    f"Couldn't send a feed post to cid {channel_id}, trying again after the next cycle", exc_info=error
+                )
+                return
+
+            retries = 0
+            del posts[:count]
+
+    @staticmethod
+    async def _send_posts(channel: GuildMessageable, posts: list):
+        """Sends one message for a batch of outbox posts from next_batch."""
+        if "embed" in posts[0]:
+            await channel.send(embeds=[discord.Embed.from_dict(post["embed"]) for post in posts])
+        else:
+            await channel.send(posts[0]["content"])
 
     async def read_feeds(self):
         """Feed poster loop."""
         await self.bot.wait_until_red_ready()
-        await self._put_feeds_in_queue()
-        self._post_queue_size = self._post_queue.qsize()
 
-        # TODO: very large queues with a lot of RSS feeds (1000+) cause this to fall behind
+        # send what was still waiting in the outbox when the cog was unloaded
+        await self._get_outbox()
+        self._resume_outbox_senders()
+        await self._start_websub()
+
         while True:
             try:
-                queue_item = await self._get_next_in_queue()
-                if not queue_item:
-                    # the queue is empty
-                    config_data = await self.config.all_channels()
-                    if not config_data:
-                        # nothing to check
-                        log.debug(f"Sleeping, nothing to do")
-                        await asyncio.sleep(30)
-                        continue
-                    if self._post_queue_size < 300:
-                        # less than 300 entries to check means 1/sec check times
-                        # the wait is (5 min - entry count) before posting again
-                        wait = 300 - self._post_queue_size
-                    else:
-                        # more than 300 entries means we used the whole 5 min
-                        # to check and post feeds so don't wait any longer to start again
-                        wait = 0
-
-                    log.debug(f"Waiting {wait}s before starting...")
-                    await asyncio.sleep(wait)
-                    await self._put_feeds_in_queue()
-                    if self._post_queue.qsize() > self._post_queue_size:
-                        # there's been more feeds added so let's update the total size
-                        # so feeds have the proper wait time @ > 300 feeds
-                        log.debug(f"Updating total queue size to {self._post_queue.qsize()}")
-                        self._post_queue_size = self._post_queue.qsize()
+                await self._put_feeds_in_queue()
+                queue_items = []
+                while True:
+                    queue_item = await self._get_next_in_queue()
+                    if not queue_item:
+                        break
+                    queue_items.append(queue_item)
+
+                if not queue_items:
+                    # nothing to check
+                    log.debug(f"Sleeping, nothing to do")
+                    await asyncio.sleep(30)
                     continue
-                else:
-                    try:
-                        # queue_item is a List of channel_priority: int, total_priority: int, queue_item: SimpleNamespace
-                        await self.get_current_feed(
-                            queue_item[2].channel, queue_item[2].feed_name, queue_item[2].feed_data
-                        )
-                    except aiohttp.client_exceptions.InvalidURL as e:
-                        log.debug(f"Feed at {e.url} is bad or took too long to respond.")
-                        continue
 
-                    if self._post_queue_size < 300:
-                        wait = 1
-                    else:
-                        wait = (300 - 10) / self._post_queue_size
-                    log.debug(f"sleeping for {wait}...")
-                    await asyncio.sleep(wait)
+                cycle_start = time.monotonic()
+                await self._run_poll_cycle(queue_items)
+                await self._sync_websub()
+                self._resume_outbox_senders()
+                elapsed = time.monotonic() - cycle_start
+
+                # cycles start every poll_min_interval seconds, if the cycle took longer than that start again right away
+                wait = max(0, (await self._get_settings())["poll_min_interval"] - elapsed)
+                log.debug(f"Checked {len(queue_items)} feeds in {elapsed:.2f}s, waiting {wait:.2f}s before starting...")
+                await asyncio.sleep(wait)
 
             except asyncio.CancelledError:
                 break
             except Exception as e:
                 log.error("An error has occurred in the RSS cog. Please report it.", exc_info=e)
+                await asyncio.sleep(30)
                 continue
 
+    async def _run_poll_cycle(self, queue_items: list):
+        """
+        Fetch all queued feeds concurrently and post them.
+
+        Fetching is bounded by the global worker count and the per-host limit. Posting
+        happens in queue order per channel, while separate channels post independently.
+        Feed urls that are not due yet according to the poll schedule are skipped.
+        """
+        checked_at = time.time()
+        cycle_start = time.perf_counter()
+        settings = await self._get_settings()
+        fetch_semaphore = asyncio.Semaphore(settings["fetch_workers"])
+        host_limit = settings["fetch_host_limit"]
+        host_semaphores = defaultdict(lambda: asyncio.Semaphore(host_limit))
+
+        # with sharding on, urls in shards of other bots are loaded from what those bots fetched
+        coordinator = await self._get_shard_coordinator()
+        owned_shards = None
+        if coordinator:
+            owned_shards = await self._run_in_shard_db(coordinator.heartbeat)
+            self._owned_shards = len(owned_shards)
+            local_urls = {queue_item[2].feed_data["url"] for queue_item in queue_items}
+            await self._run_in_shard_db(coordinator.want, local_urls, 3 * settings["poll_max_interval"])
+
+        # the same url can be subscribed to in many channels and guilds,
+        # each url is fetched and parsed once per cycle and shared between all of them
+        fetch_tasks = {}
+        shared_urls = set()
+        channel_items = {}
+        for queue_item in queue_items:
+            # queue_item is a List of channel_priority: int, total_priority: int, queue_item: SimpleNamespace
+            rss_feed = queue_item[2]
+            url = rss_feed.feed_data["url"]
+            fetch_task = fetch_tasks.get(url)
+            if fetch_task is None:
+                if owned_shards is not None and not coordinator.owns(url, owned_shards):
+                    # loading a shared feed is cheap, so these are checked every cycle
+                    fetch_task = asyncio.create_task(self._load_shared_feed(url))
+                    shared_urls.add(url)
+                elif not self._poll_schedule.is_due(url, checked_at):
+                    continue
+                else:
+                    fetch_task = asyncio.create_task(self._fetch_for_cycle(url, fetch_semaphore, host_semaphores))
+                fetch_tasks[url] = fetch_task
+            channel_items.setdefault(rss_feed.channel.id, []).append((rss_feed, fetch_task))
+
+        # urls in this bot's shards that only other bots are subscribed to are fetched for them
+        wanted_tasks = {}
+        if coordinator:
+            for url in await self._run_in_shard_db(coordinator.wanted_urls, owned_shards):
+                if url not in fetch_tasks and url not in local_urls and self._poll_schedule.is_due(url, checked_at):
+                    fetch_task = asyncio.create_task(self._fetch_for_cycle(url, fetch_semaphore, host_semaphores))
+                    wanted_tasks[url] = fetch_tasks[url] = fetch_task
+
+        log.debug(f"Fetching {len(fetch_tasks)} unique urls for {len(queue_items)} feeds")
+        try:
+            # fetching doesn't hold the posting lock, so WebSub pushes are posted while slow websites load
+            await asyncio.gather(*fetch_tasks.values(), return_exceptions=True)
+            async with self._posting_lock:
+                for items in channel_items.values():
+                    for rss_feed, _ in items:
+                        self._unposted[rss_feed.feed_data["url"]] += 1
+                failed_urls = set().union(
+                    *await asyncio.gather(*(self._post_channel_feeds(items) for items in channel_items.values()))
+                )
+
+                # every channel using a url compares against the same seen entries during a cycle,
+                # so the entries found in this cycle are only marked as seen once all of them are done
+                await self._save_outbox()
+                changed_urls = await self._save_seen_updates()
+                self._unposted.clear()
+                await self._flush_last_scraped()
+                self._keep_validators(set(fetch_tasks) - failed_urls)
+        finally:
+            for fetch_task in fetch_tasks.values():
+                fetch_task.cancel()
+            self._new_url_validators.clear()
+            self._new_body_digests.clear()
+
+        # urls fetched only for other bots have no seen entries here, any new content counts as a change
+        changed_urls.update(
+            url
+            for url, fetch_task in wanted_tasks.items()
+            if not fetch_task.cancelled()
+            and not fetch_task.exception()
+            and isinstance(fetch_task.result(), feedparser.util.FeedParserDict)
+        )
+        fetched_tasks = {url: fetch_task for url, fetch_task in fetch_tasks.items() if url not in shared_urls}
+        await self._schedule_next_checks(fetched_tasks, changed_urls, checked_at)
+        self._poll_stats.record_cycle(checked_at, time.perf_counter() - cycle_start, len(queue_items), len(fetch_tasks))
+
+    def _keep_validators(self, urls: set):
+        """Helper for the feed loop, uses the cache validators and body digests of this cycle for these urls."""
+        for url in urls:
+            if url in self._new_url_validators:
+                self._url_validators[url] = self._new_url_validators.pop(url)
+            if url in self._new_body_digests:
+                self._body_digests[url] = self._new_body_digests.pop(url)
+
+    async def _schedule_next_checks(self, fetch_tasks: dict, changed_urls: set, checked_at: float):
+        """Helper for the feed loop, sets when each url fetched in this cycle is checked again."""
+        settings = await self._get_settings()
+        min_interval = settings["poll_min_interval"]
+        max_interval = settings["poll_max_interval"]
+        for url, fetch_task in fetch_tasks.items():
+            if fetch_task.cancelled() or fetch_task.exception():
+                feedparser_obj = None
+            else:
+                feedparser_obj = fetch_task.result()
+            if getattr(feedparser_obj, "host_failing", False):
+                # the circuit breaker of the host decides when the url is checked again
+                continue
+            interval = self._poll_schedule.record(
+                url,
+                feedparser_obj,
+                changed=url in changed_urls,
+                checked_at=checked_at,
+                # pushed feeds are only polled now and then in case the hub misses a post
+                min_interval=max_interval if self._websub_active(url) else min_interval,
+                max_interval=max_interval,
+            )
+            log.debug(f"Checking {url} again in {interval}s")
+
+    async def _get_seen_index(self):
+        """Returns the seen entry index of every feed url, loading it from config the first time."""
+        if self._seen_index is None:
+            all_indexes = await self.config.custom("SEEN_ENTRIES").all()
+            self._seen_index = {
+                url: SeenIndex.from_json(data["index"]) for url, data in all_indexes.items() if data.get("index")
+            }
+        return self._seen_index
+
+    async def _clear_seen_index(self, website: str):
+        """
+        Forgets the seen entries of the feed urls with entries from a website, these feeds go back to comparing
+        the last title/link/time until they are checked once. Entry fingerprints include the post time,
+        so this is needed when the time parsing override of the website changes.
+        Urls that weren't checked since the cog was loaded are cleared too, as their website isn't known yet.
+        """
+        seen_index = await self._get_seen_index()
+        await self._drop_seen_indexes({url for url in seen_index if self._feed_websites.get(url, website) == website})
+
+    async def _drop_seen_indexes(self, urls: set):
+        """Helper for _forget_urls/_clear_seen_index, drops the seen index of urls with one config write."""
+        seen_index = await self._get_seen_index()
+        urls = {url for url in urls if url in seen_index}
+        if not urls:
+            return
+        for url in urls:
+            del seen_index[url]
+            self._seen_updates.pop(url, None)
+            self._seen_readers.pop(url, None)
+        async with self.config.custom("SEEN_ENTRIES").all() as all_indexes:
+            for url in urls:
+                all_indexes.pop(url, None)
+
+    async def _save_seen_updates(self, only_urls: set = None):
+        """
+        Adds the entry fingerprints found in this feed loop cycle to the seen index and saves changed urls.
+        With only_urls, the updates of other urls are left for later. Returns the urls that had new entries.
+
+        The channel feeds that compared against the index get its new position as their seen mark,
+        which is saved with the last scraped updates in _flush_last_scraped.
+        """
+        seen_index = await self._get_seen_index()
+        subscriptions = await self._get_subscriptions()
+        urls = subscriptions.urls()
+        if only_urls is None:
+            seen_updates, self._seen_updates = self._seen_updates, {}
+        else:
+            seen_updates = {url: self._seen_updates.pop(url) for url in only_urls if url in self._seen_updates}
+        changed_urls = set()
+        for url, entry_ids in seen_updates.items():
+            readers = self._seen_readers.pop(url, ())
+            if url not in urls:
+                # the feed was removed during the cycle
+                continue
+            url_index = seen_index.setdefault(url, SeenIndex())
+            if url_index.add(entry_ids):
+                changed_urls.add(url)
+            for channel_id, feed_name in readers:
+                feed_data = subscriptions.channels.get(channel_id, {}).get(feed_name)
+                if feed_data is not None and feed_data.get("seen_mark") != url_index.position:
+                    last_scraped = self._last_scraped_updates.setdefault(channel_id, {}).setdefault(feed_name, {})
+                    last_scraped["seen_mark"] = url_index.position
+        if changed_urls:
+            # one write for all urls, every config write saves the whole file with the JSON backend
+            async with self.config.custom("SEEN_ENTRIES").all() as all_indexes:
+                for url in changed_urls:
+                    all_indexes[url] = {"index": seen_index[url].to_json()}
+        return changed_urls
+
+    async def _fetch_for_cycle(self, url: str, fetch_semaphore: asyncio.Semaphore, host_semaphores: dict):
+        """Helper for the feed loop, fetches a feed once a host slot and a worker slot are free."""
+        host = urlparse(url).netloc
+        # wait on the host first so that a busy host doesn't hold on to worker slots
+        async with host_semaphores[host]:
+            # checked once a host slot is free, so that feeds queued behind the fetches that tripped it are skipped
+            if not self._circuit_breakers[host].allow():
+                log.debug(f"Skipping {url}, {host} is failing")
+                self._poll_stats.record_error(url, "Skipped: host failing")
+                return SimpleNamespace(
+                    entries=None, error=f"{host} is failing, the feed was skipped.", url=url, host_failing=True
+                )
+            async with fetch_semaphore:
+                feedparser_obj = await self._fetch_feedparser_object(url, conditional=True)
+
+        coordinator = await self._get_shard_coordinator()
+        if coordinator and isinstance(feedparser_obj, feedparser.util.FeedParserDict):
+            self._shared_versions[url] = await self._run_in_shard_db(coordinator.store, url, feedparser_obj)
+        return feedparser_obj
+
+    async def _load_shared_feed(self, url: str):
+        """Helper for the feed loop, loads a feed that the bot owning its shard fetched."""
+        coordinator = await self._get_shard_coordinator()
+        shared = await self._run_in_shard_db(coordinator.load, url, self._shared_versions.get(url, 0))
+        if shared is None:
+            # nothing new since the last time this url was loaded
+            return SimpleNamespace(entries=None, error=None, not_modified=True, url=url)
+        self._shared_versions[url], feedparser_obj = shared
+        # the shared copy has the whole feed header, so its hub link is registered like for a fetched feed
+        self._feed_hubs[url] = find_hub(feedparser_obj.feed)
+        return feedparser_obj
+
+    async def _get_shard_coordinator(self):
+        """Returns the shard coordinator when sharded polling is on, otherwise None."""
+        settings = await self._get_settings()
+        path = settings["shard_db"]
+        if self._shard_coordinator and self._shard_coordinator.path != path:
+            await self._run_in_shard_db(self._shard_coordinator.close)
+            self._shard_coordinator = None
+        if path and self._shard_coordinator is None:
+            # workers that missed a few heartbeats lose their shards
+            worker_ttl = max(600, 3 * settings["poll_min_interval"])
+            self._shard_coordinator = ShardCoordinator(path, worker_ttl)
+        return self._shard_coordinator
+
+    async def _run_in_shard_db(self, func, *args):
+        """Runs a ShardCoordinator method in the thread that owns its database connection."""
+        if self._shard_executor is None:
+            self._shard_executor = ThreadPoolExecutor(1, thread_name_prefix="rss_shards")
+        return await asyncio.get_running_loop().run_in_executor(self._shard_executor, func, *args)
+
+    async def _start_websub(self):
+        """Starts the WebSub receiver when push mode is on, it is restarted when the settings change."""
+        await self._stop_websub()
+        settings = await self._get_settings()
+        if not settings["websub_url"]:
+            return
+        if self._websub is None:
+            all_subscriptions = await self.config.custom("WEBSUB").all()
+            self._websub = {
+                url: data["subscription"] for url, data in all_subscriptions.items() if data.get("subscription")
+            }
+            self._websub_callbacks = {subscription["callback_id"]: url for url, subscription in self._websub.items()}
+
+        receiver = WebSubReceiver(
+            self._get_websub_subscription, self._on_websub_verified, self._on_websub_content, settings["max_feed_size"]
+        )
+        host, port = settings["websub_host"], settings["websub_port"]
+        try:
+            await receiver.start(host, port)
+        except OSError as e:
+            log.error(f"Couldn't start the WebSub receiver on {host}:{port}, all feeds are polled", exc_info=e)
+            return
+        self._websub_receiver = receiver
+
+    async def _stop_websub(self):
+        for task in self._websub_tasks:
+            task.cancel()
+        if self._websub_receiver:
+            await self._websub_receiver.stop()
+            self._websub_receiver = None
+
+    async def _clear_websub(self):
+        """Forgets all WebSub subscriptions, hubs stop pushing to their callbacks once they are not found."""
+        await self.config.custom("WEBSUB").clear()
+        self._websub = None
+        self._websub_callbacks = {}
+
+    def _websub_active(self, url: str):
+        """Whether a hub pushes new posts of a feed url, according to a verified subscription that didn't run out."""
+        if self._websub_receiver is None:
+            return False
+        subscription = self._websub.get(url)
+        return bool(subscription and subscription["verified"] and subscription["lease_until"] > time.time())
+
+    def _get_websub_subscription(self, callback_id: str):
+        url = self._websub_callbacks.get(callback_id)
+        return self._websub.get(url) if url else None
+
+    async def _on_websub_verified(self, callback_id: str, subscription: dict, lease_seconds: int):
+        subscription["verified"] = True
+        subscription["lease_until"] = time.time() + lease_seconds
+        await self.config.custom("WEBSUB", subscription["url"]).subscription.set(subscription)
+        log.debug(f"WebSub subscription to {subscription['topic']} verified for {lease_seconds}s")
+
+    def _on_websub_content(self, url: str, body: bytes):
+        task = asyncio.create_task(self._post_pushed_feed(url, body))
+        self._websub_tasks.add(task)
+        task.add_done_callback(self._websub_tasks.discard)
+
+    async def _post_pushed_feed(self, url: str, body: bytes):
+        """Posts a feed pushed by a WebSub hub to every channel with its url, the same way the feed loop does."""
+        try:
+            parsed = await self._run_in_parser_pool(parse_feed, body)
+            parsed.pop("parse_time")
+            feedparser_obj = feedparser.util.FeedParserDict(parsed)
+            if feedparser_obj.bozo or not feedparser_obj.entries:
+                # pushes about deleted posts have no entries
+                return
+
+            async with self._posting_lock:
+                subscribers = (await self._get_subscriptions()).subscribers(url)
+                self._unposted[url] += len(subscribers)
+                for channel_id, feed_name, feed_data in subscribers:
+                    channel = self._get_cached_channel(channel_id)
+                    try:
+                        if channel and not await self.bot.cog_disabled_in_guild(self, channel.guild):
+                            await self.get_current_feed(channel, feed_name, feed_data, feedparser_obj=feedparser_obj)
+                    except Exception as e:
+                        log.error(f"Error while posting a WebSub push for {feed_name} on cid {channel_id}", exc_info=e)
+                        # the channel feed keeps its seen mark, so it compares against these entries again next time
+                        self._seen_readers.get(url, set()).discard((channel_id, feed_name))
+                    self._unposted[url] -= 1
+                await self._save_outbox()
+                await self._save_seen_updates()
+                self._unposted.clear()
+                await self._flush_last_scraped()
+        except Exception as e:
+            log.error(f"Error while posting a WebSub push for {url}", exc_info=e)
+
+    async def _sync_websub(self):
+        """
+        Subscribes to the hubs of feeds that have one, renews subscriptions that run out soon
+        and unsubscribes from feeds that are not used anymore.
+        """
+        if self._websub_receiver is None:
+            return
+        urls = (await self._get_subscriptions()).urls()
+        now = time.time()
+        for url, subscription in list(self._websub.items()):
+            if url not in urls:
+                await self._websub_request(subscription, "unsubscribe")
+                continue
+            renew = not subscription["verified"] or subscription["lease_until"] - now < RENEW_BEFORE
+            if renew and now - subscription["requested_at"] > VERIFY_TIMEOUT:
+                await self._websub_request(subscription, "subscribe")
+
+        for url in list(urls):
+            if url in self._websub or not self._feed_hubs.get(url):
+                continue
+            hub, topic = self._feed_hubs[url]
+            subscription = {
+                "url": url,
+                "hub": hub,
+                # the topic is the feed's own url from its rel="self" link, hubs know feeds by that url
+                "topic": topic or url,
+                "callback_id": secrets.token_urlsafe(16),
+                "secret": secrets.token_hex(32),
+                "verified": False,
+                "lease_until": 0,
+                "requested_at": 0,
+            }
+            self._websub[url] = subscription
+            self._websub_callbacks[subscription["callback_id"]] = url
+            await self._websub_request(subscription, "subscribe")
+
+    async def _websub_request(self, subscription: dict, mode: str):
+        """Helper for _sync_websub, sends a subscribe or unsubscribe request to the hub of a subscription."""
+        url = subscription["url"]
+        if mode == "subscribe":
+            subscription["requested_at"] = time.time()
+            # saved before the request, some hubs verify the subscription before they answer
+            await self.config.custom("WEBSUB", url).subscription.set(subscription)
+        else:
+            del self._websub[url]
+            self._websub_callbacks.pop(subscription["callback_id"], None)
+            await self.config.custom("WEBSUB", url).clear()
+
+        callback_url = (await self._get_settings())["websub_url"].rstrip("/")
+        data = {
+            "hub.mode": mode,
+            "hub.topic": subscription["topic"],
+            "hub.callback": f"{callback_url}/{subscription['callback_id']}",
+        }
+        if mode == "subscribe":
+            data["hub.secret"] = subscription["secret"]
+            data["hub.lease_seconds"] = str(LEASE_SECONDS)
+        try:
+            async with self._session.post(subscription["hub"], data=data) as resp:
+                if resp.status not in (202, 204):
+                    log.warning(f"WebSub hub {subscription['hub']} refused to {mode} {url}: HTTP {resp.status}")
+        except (aiohttp.ClientError, asyncio.exceptions.TimeoutError) as e:
+            log.warning(f"Couldn't reach WebSub hub {subscription['hub']} to {mode} {url}: {e!r}")
+
+    async def _post_channel_feeds(self, channel_items: list):
+        """Helper for the feed loop, posts the fetched feeds of one channel in order. Returns the urls that failed."""
+        failed_urls = set()
+        for rss_feed, fetch_task in channel_items:
+            try:
+                feedparser_obj = await fetch_task
+                await self.get_current_feed(
+                    rss_feed.channel, rss_feed.feed_name, rss_feed.feed_data, feedparser_obj=feedparser_obj
+                )
+            except aiohttp.client_exceptions.InvalidURL as e:
+                log.debug(f"Feed at {e.url} is bad or took too long to respond.")
+            except Exception as e:
+                log.error(f"Error while posting feed {rss_feed.feed_name} on cid {rss_feed.channel.id}", exc_info=e)
+                # the channel feed keeps its seen mark, so it compares against these entries again next time
+                self._seen_readers.get(rss_feed.feed_data["url"], set()).discard(
+                    (rss_feed.channel.id, rss_feed.feed_name)
+                )
+                failed_urls.add(rss_feed.feed_data["url"])
+            self._unposted[rss_feed.feed_data["url"]] -= 1
+        return failed_urls
+
     async def _put_feeds_in_queue(self):
         log.debug("Putting feeds in queue")
         try:
-            config_data = await self.config.all_channels()
+            subscriptions = await self._get_subscriptions()
+            # guild id: whether the cog is disabled there
+            disabled_guilds = {}
             total_index = 0
-            for channel_id, channel_feed_list in config_data.items():
-                channel = await self._get_channel_object(channel_id)
+            for channel_id, feeds in list(subscriptions.channels.items()):
+                channel = self._get_cached_channel(channel_id)
                 if not channel:
                     continue
 
-                if await self.bot.cog_disabled_in_guild(self, channel.guild):
+                guild_id = channel.guild.id
+                if guild_id not in disabled_guilds:
+                    disabled_guilds[guild_id] = await self.bot.cog_disabled_in_guild(self, channel.guild)
+                if disabled_guilds[guild_id]:
                     continue
 
-                for feed_key, feed in channel_feed_list.items():
-                    for feed_name, feed_data in feed.items():
-                        rss_feed = SimpleNamespace(channel=channel, feed_name=feed_name, feed_data=feed_data)
-                        keys = list(feed.keys())
-                        channel_index = keys.index(feed_name)
-                        total_index += 1
-                        queue_entry = [channel_index, total_index, rss_feed]
-                        log.debug(f"Putting {channel_index}-{total_index}-{channel}-{feed_name} in queue")
-                        await self._post_queue.put(queue_entry)
+                for channel_index, (feed_name, feed_data) in enumerate(feeds.items()):
+                    rss_feed = SimpleNamespace(channel=channel, feed_name=feed_name, feed_data=feed_data)
+                    total_index += 1
+                    queue_entry = [channel_index, total_index, rss_feed]
+                    log.debug(f"Putting {channel_index}-{total_index}-{channel}-{feed_name} in queue")
+                    await self._post_queue.put(queue_entry)
 
         except Exception as e:
             log.exception(e, exc_info=e)
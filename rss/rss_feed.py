@@ -18,6 +18,7 @@ class RssFeed():
         self.embed_color: str = kwargs.get("embed_color", None)
         self.embed_image: str = kwargs.get("embed_image", None)
         self.embed_thumbnail: str = kwargs.get("embed_thumbnail", None)
+        self.seen_mark: int = kwargs.get("seen_mark", None)
 
     def to_json(self) -> dict:
         return {
@@ -33,6 +34,7 @@ class RssFeed():
             "embed_color": self.embed_color,
             "embed_image": self.embed_image,
             "embed_thumbnail": self.embed_thumbnail,
+            "seen_mark": self.seen_mark,
         }
 
     @classmethod
@@ -50,4 +52,5 @@ class RssFeed():
             embed_color=data["embed_color"] if data["embed_color"] else None,
             embed_image=data["embed_image"] if data["embed_image"] else None,
             embed_thumbnail=data["embed_thumbnail"] if data["embed_thumbnail"] else None,
+            seen_mark=data.get("seen_mark", None),
         )
@@ -0,0 +1,87 @@
+import base64
+from array import array
+from collections import deque
+from typing import Iterable, Optional
+
+
+class SeenIndex():
+    """
+    Bounded set of 64-bit entry fingerprints for one feed url.
+
+    Fingerprints are kept in a fixed-size ring and the least recently seen ones are dropped
+    first once it is full. The ring grows when a feed has more entries than fit in half of it,
+    so entries that are still in the feed are never dropped.
+
+    Every fingerprint also keeps the position it was first seen at, positions count up with each new
+    fingerprint. Channels remember the position they last caught up to, so a channel that was skipped
+    while others marked new entries as seen still finds those entries later.
+    """
+
+    DEFAULT_SIZE = 128
+
+    def __init__(self, fingerprints: Iterable[int] = (), size: int = DEFAULT_SIZE, positions: Iterable[int] = None):
+        fingerprints = list(fingerprints)
+        positions = range(1, len(fingerprints) + 1) if positions is None else list(positions)
+        self._ring = deque(fingerprints, maxlen=size)
+        first_seen = dict(zip(fingerprints, positions))
+        # fingerprint: position it was first seen at
+        self._positions = {fingerprint: first_seen[fingerprint] for fingerprint in self._ring}
+        self.position = max(self._positions.values(), default=0)
+
+    def __contains__(self, fingerprint: int):
+        return fingerprint in self._positions
+
+    def __len__(self):
+        return len(self._ring)
+
+    @property
+    def size(self) -> int:
+        return self._ring.maxlen
+
+    def seen(self, fingerprint: int, mark: Optional[int] = None) -> bool:
+        """
+        Whether a fingerprint is in the index, and with a mark, whether it was first seen at or before that position.
+        Without a mark everything in the index counts as seen.
+        """
+        position = self._positions.get(fingerprint)
+        return position is not None and (mark is None or position <= mark)
+
+    def add(self, fingerprints: Iterable[int]) -> bool:
+        """
+        Marks all fingerprints of a feed check as seen, returns True if any of them were new.
+
+        Fingerprints that were already in the ring are moved to the most recent end with the new ones,
+        they keep the position they were first seen at.
+        """
+        fingerprints = list(dict.fromkeys(fingerprints))
+        if all(fingerprint in self._positions for fingerprint in fingerprints):
+            return False
+
+        for fingerprint in fingerprints:
+            if fingerprint not in self._positions:
+                self.position += 1
+                self._positions[fingerprint] = self.position
+        size = max(self.size, 2 * len(fingerprints))
+        checked = set(fingerprints)
+        self._ring = deque(
+            [fingerprint for fingerprint in self._ring if fingerprint not in checked] + fingerprints, maxlen=size
+        )
+        self._positions = {fingerprint: self._positions[fingerprint] for fingerprint in self._ring}
+        return True
+
+    def to_json(self) -> dict:
+        return {
+            "size": self.size,
+            "fingerprints": base64.b64encode(array("Q", self._ring).tobytes()).decode("ascii"),
+            "positions": base64.b64encode(
+                array("Q", [self._positions[fingerprint] for fingerprint in self._ring]).tobytes()
+            ).decode("ascii"),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict):
+        fingerprints = array("Q")
+        fingerprints.frombytes(base64.b64decode(data["fingerprints"]))
+        positions = array("Q")
+        positions.frombytes(base64.b64decode(data["positions"]))
+        return cls(fingerprints, size=data["size"] if data["size"] else cls.DEFAULT_SIZE, positions=positions)
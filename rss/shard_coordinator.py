@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from typing import Iterable, Optional
+
+import feedparser
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS workers (
+    worker_id TEXT PRIMARY KEY,
+    heartbeat REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS wanted (
+    url TEXT PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    wanted_until REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS wanted_shard ON wanted (shard);
+CREATE TABLE IF NOT EXISTS feeds (
+    url TEXT PRIMARY KEY,
+    fetched_at REAL NOT NULL,
+    feed TEXT NOT NULL
+);
+"""
+
+# marks a time.struct_time in a stored feed, feedparser uses them for every parsed date
+STRUCT_TIME_KEY = "__struct_time__"
+
+
+def feed_to_json(value):
+    """Turns a parsed feed into builtin types that json can store, anything else is stored as text."""
+    if isinstance(value, time.struct_time):
+        return {STRUCT_TIME_KEY: list(value)}
+    if isinstance(value, dict):
+        return {str(key): feed_to_json(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [feed_to_json(item) for item in value]
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+def feed_from_json(value):
+    """Rebuilds a parsed feed from feed_to_json, dicts become FeedParserDicts again."""
+    if isinstance(value, dict):
+        if STRUCT_TIME_KEY in value:
+            return time.struct_time(value[STRUCT_TIME_KEY])
+        return feedparser.util.FeedParserDict({key: feed_from_json(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [feed_from_json(item) for item in value]
+    return value
+
+
+def url_shard(url: str, shards: int) -> int:
+    """The shard of a feed url, the same in every process."""
+    return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big") % shards
+
+
+def shard_owner(shard: int, workers: Iterable[str]) -> Optional[str]:
+    """
+    Picks the worker that owns a shard with rendezvous hashing.
+    Only the shards of a worker that joins or leaves move to another worker.
+    """
+    return max(
+        workers,
+        key=lambda worker_id: hashlib.blake2b(f"{worker_id}:{shard}".encode("utf-8"), digest_size=8).digest(),
+        default=None,
+    )
+
+
+class ShardCoordinator():
+    """
+    Splits feed fetching between several bot processes through a shared SQLite database.
+
+    Every process that has the RSS cog loaded is a worker. Feed urls are hashed into shards and each
+    shard is owned by one live worker, which fetches and parses the urls in it for all workers.
+    Parsed feeds are stored in the database as json and every worker posts to its own channels from there.
+
+    All methods block on SQLite and are meant to be run in an executor.
+    """
+
+    SHARDS = 256
+
+    def __init__(self, path: str, worker_ttl: float):
+        self.path = path
+        # workers that did not check in for this many seconds lose their shards
+        self.worker_ttl = worker_ttl
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._connection = None
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            self._connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self.leave()
+            self._connection.close()
+            self._connection = None
+
+    def heartbeat(self) -> set:
+        """Checks this worker in and returns the shards it owns until the next heartbeat."""
+        now = time.time()
+        with self.connection as connection:
+            connection.execute(
+                "INSERT INTO workers (worker_id, heartbeat) VALUES (?, ?) "
+                "ON CONFLICT (worker_id) DO UPDATE SET heartbeat = excluded.heartbeat",
+                (self.worker_id, now),
+            )
+            connection.execute("DELETE FROM workers WHERE heartbeat < ?", (now - self.worker_ttl,))
+            connection.execute("DELETE FROM wanted WHERE wanted_until < ?", (now,))
+            connection.execute(
+                "DELETE FROM feeds WHERE url NOT IN (SELECT url FROM wanted) AND fetched_at < ?",
+                (now - self.worker_ttl,),
+            )
+            workers = [row[0] for row in connection.execute("SELECT worker_id FROM workers")]
+        return {shard for shard in range(self.SHARDS) if shard_owner(shard, workers) == self.worker_id}
+
+    def leave(self):
+        """Gives up this worker's shards right away instead of when it times out."""
+        with self.connection as connection:
+            connection.execute("DELETE FROM workers WHERE worker_id = ?", (self.worker_id,))
+
+    def want(self, urls: Iterable[str], wanted_for: float):
+        """Asks the owners of these urls to keep fetching them for at least `wanted_for` seconds."""
+        wanted_until = time.time() + wanted_for
+        with self.connection as connection:
+            connection.executemany(
+                "INSERT INTO wanted (url, shard, wanted_until) VALUES (?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET wanted_until = MAX(wanted_until, excluded.wanted_until)",
+                [(url, url_shard(url, self.SHARDS), wanted_until) for url in urls],
+            )
+
+    def wanted_urls(self, shards: set) -> list:
+        """Returns the urls that any worker wants in these shards."""
+        if not shards:
+            return []
+        placeholders = ",".join("?" * len(shards))
+        rows = self.connection.execute(f"SELECT url FROM wanted WHERE shard IN ({placeholders})", tuple(shards))
+        return [row[0] for row in rows]
+
+    def owns(self, url: str, shards: set) -> bool:
+        return url_shard(url, self.SHARDS) in shards
+
+    def store(self, url: str, feed):
+        """Saves a parsed feed for the other workers, returns the time it was saved at."""
+        fetched_at = time.time()
+        with self.connection as connection:
+            connection.execute(
+                "INSERT INTO feeds (url, fetched_at, feed) VALUES (?, ?, ?) "
+                "ON CONFLICT (url) DO UPDATE SET fetched_at = excluded.fetched_at, feed = excluded.feed",
+                (url, fetched_at, json.dumps(feed_to_json(feed), separators=(",", ":"))),
+            )
+        return fetched_at
+
+    def load(self, url: str, newer_than: float):
+        """Returns (fetched_at, parsed feed) when a worker stored a feed newer than `newer_than`, else None."""
+        row = self.connection.execute(
+            "SELECT fetched_at, feed FROM feeds WHERE url = ? AND fetched_at > ?", (url, newer_than)
+        ).fetchone()
+        if row is None:
+            return None
+        return row[0], feed_from_json(json.loads(row[1]))
@@ -0,0 +1,57 @@
+from typing import Mapping
+
+
+class Subscriptions():
+    """
+    In-memory copy of the feeds of every channel, so that the feed loop doesn't read all channels from config.
+
+    Feeds are kept per channel id in the order they were added, and indexed by feed url.
+    The copy is only changed through set_channel and remove_channel, after config was saved.
+    """
+
+    def __init__(self, all_channels: Mapping[int, dict] = None):
+        # channel id: {feed name: feed data}
+        self.channels = {}
+        # url: {(channel id, feed name)}
+        self._by_url = {}
+        for channel_id, data in (all_channels or {}).items():
+            self.set_channel(channel_id, data.get("feeds", {}))
+
+    def __len__(self):
+        return sum(len(feeds) for feeds in self.channels.values())
+
+    def set_channel(self, channel_id: int, feeds: Mapping[str, dict]) -> set:
+        """Replaces the feeds of a channel, the feeds are copied. Returns the urls that no channel uses anymore."""
+        unused = self.remove_channel(channel_id)
+        if not feeds:
+            return unused
+        self.channels[channel_id] = {feed_name: dict(feed_data) for feed_name, feed_data in feeds.items()}
+        for feed_name, feed_data in feeds.items():
+            self._by_url.setdefault(feed_data["url"], set()).add((channel_id, feed_name))
+        return {url for url in unused if url not in self._by_url}
+
+    def remove_channel(self, channel_id: int) -> set:
+        """Removes the feeds of a channel, returns the urls that no channel uses anymore."""
+        feeds = self.channels.pop(channel_id, None)
+        unused = set()
+        if not feeds:
+            return unused
+        for feed_name, feed_data in feeds.items():
+            subscribers = self._by_url.get(feed_data["url"])
+            if subscribers is None:
+                continue
+            subscribers.discard((channel_id, feed_name))
+            if not subscribers:
+                del self._by_url[feed_data["url"]]
+                unused.add(feed_data["url"])
+        return unused
+
+    def subscribers(self, url: str) -> list:
+        """Returns (channel id, feed name, feed data) for every channel feed that uses this url."""
+        return [
+            (channel_id, feed_name, self.channels[channel_id][feed_name])
+            for channel_id, feed_name in self._by_url.get(url, ())
+        ]
+
+    def urls(self):
+        return self._by_url.keys()
@@ -5,6 +5,15 @@ INTERNAL_TAGS = ["is_special", "template_tags", "embed", "embed_color", "embed_i
 
 VALID_IMAGES = ["png", "webp", "gif", "jpeg", "jpg"]
 
+# content type: the file type filetype.guess gives for that image type
+IMAGE_CONTENT_TYPES = {
+    "image/png": "png",
+    "image/webp": "webp",
+    "image/gif": "gif",
+    "image/jpeg": "jpg",
+    "image/jpg": "jpg",
+}
+
 
 class TagType(Enum):
     PLAINTEXT = 1
@@ -0,0 +1,124 @@
+import hashlib
+import hmac
+import logging
+from typing import Awaitable, Callable, Optional
+
+from aiohttp import web
+
+log = logging.getLogger("red.aikaterna.rss")
+
+
+# leases asked from hubs, hubs can give out shorter ones
+LEASE_SECONDS = 7 * 24 * 60 * 60
+# subscriptions are renewed when their lease ends sooner than this
+RENEW_BEFORE = 24 * 60 * 60
+# subscriptions a hub did not verify in this time are asked for again
+VERIFY_TIMEOUT = 60 * 60
+
+SIGNATURE_METHODS = {"sha1": hashlib.sha1, "sha256": hashlib.sha256, "sha384": hashlib.sha384, "sha512": hashlib.sha512}
+
+
+def find_hub(feed) -> Optional[tuple]:
+    """Returns (hub url, topic url) from the rel="hub" and rel="self" links of a feed header, None without a hub."""
+    hub = topic = None
+    for link in feed.get("links", []):
+        if link.get("rel") == "hub" and not hub:
+            hub = link.get("href")
+        elif link.get("rel") == "self" and not topic:
+            topic = link.get("href")
+    if not hub:
+        return None
+    return hub, topic
+
+
+def valid_signature(secret: str, body: bytes, signature: Optional[str]) -> bool:
+    """Checks the X-Hub-Signature header of a pushed body against the secret of its subscription."""
+    if not signature or "=" not in signature:
+        return False
+    method, digest = signature.split("=", 1)
+    digestmod = SIGNATURE_METHODS.get(method.lower())
+    if digestmod is None:
+        return False
+    expected = hmac.new(secret.encode("utf-8"), body, digestmod).hexdigest()
+    return hmac.compare_digest(expected, digest.strip().lower())
+
+
+class WebSubReceiver():
+    """
+    Small web server that hubs call back to.
+
+    Every subscription has its own callback path. Hubs verify subscriptions with a GET request,
+    and push new content with a POST request signed with the secret of the subscription.
+    """
+
+    def __init__(
+        self,
+        get_subscription: Callable[[str], Optional[dict]],
+        on_verified: Callable[[str, dict, int], Awaitable[None]],
+        on_content: Callable[[str, bytes], None],
+        max_size: int,
+    ):
+        # callback id: subscription dict with at least "topic", "secret" and "url", or None
+        self.get_subscription = get_subscription
+        # called with the callback id, the subscription and the lease in seconds once a hub verified a subscription
+        self.on_verified = on_verified
+        # called with the feed url and body of verified pushes, it should not block
+        self.on_content = on_content
+        self.max_size = max_size
+        self._runner = None
+
+    async def start(self, host: str, port: int):
+        app = web.Application(client_max_size=self.max_size)
+        app.router.add_get("/{callback_id}", self._verify)
+        app.router.add_post("/{callback_id}", self._receive)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        try:
+            await web.TCPSite(self._runner, host, port).start()
+        except OSError:
+            await self.stop()
+            raise
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def _verify(self, request: web.Request):
+        mode = request.query.get("hub.mode")
+        topic = request.query.get("hub.topic")
+        challenge = request.query.get("hub.challenge")
+        subscription = self.get_subscription(request.match_info["callback_id"])
+
+        if mode == "denied":
+            log.warning(f"WebSub hub denied the subscription to {topic}: {request.query.get('hub.reason')}")
+            return web.Response()
+        if challenge is None:
+            raise web.HTTPBadRequest()
+        if mode == "unsubscribe":
+            # unsubscribes are confirmed for callbacks that are not used anymore only
+            if subscription is not None:
+                raise web.HTTPNotFound()
+            return web.Response(text=challenge)
+        if mode != "subscribe" or subscription is None or subscription["topic"] != topic:
+            raise web.HTTPNotFound()
+
+        try:
+            lease_seconds = int(request.query.get("hub.lease_seconds", LEASE_SECONDS))
+        except ValueError:
+            lease_seconds = LEASE_SECONDS
+        await self.on_verified(request.match_info["callback_id"], subscription, lease_seconds)
+        return web.Response(text=challenge)
+
+    async def _receive(self, request: web.Request):
+        subscription = self.get_subscription(request.match_info["callback_id"])
+        if subscription is None:
+            # tells the hub to stop sending to this callback
+            raise web.HTTPGone()
+        body = await request.read()
+        # pushes with a bad signature are acknowledged but ignored, as WebSub asks
+        if valid_signature(subscription["secret"], body, request.headers.get("X-Hub-Signature")):
+            self.on_content(subscription["url"], body)
+        else:
+            log.warning(f"Ignoring a WebSub push for {subscription['url']} with a bad signature")
+        return web.Response(status=202)
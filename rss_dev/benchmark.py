@@ -0,0 +1,272 @@
+"""
+Offline benchmark for the RSS cog's feed pipeline.
+
+Runs each stage of posting a feed against the recorded feeds in rss_dev/fixtures,
+served from a local aiohttp server, and posts into a fake channel instead of Discord.
+No internet access and no running bot are needed, only the packages Red and the cog depend on.
+
+Run it from the root of the repository:
+
+    python rss_dev/benchmark.py
+    python rss_dev/benchmark.py --sizes 10,1000 --no-allocations --json results.json
+
+Stages, timed over every feed:
+    fetch      _fetch_for_cycle: download and parse each feed url, like the feed loop does
+    sort       _sort_by_post_time on the entries of each feed
+    tags       _append_bs4_tags on the newest entry of each feed
+    template   quiet_safe_substitute of the default template on that entry
+    embed      _get_current_feed_embed, including the image checks, and sending the embeds to the fake channel
+
+Each feed url is a copy of one of the fixtures, so the same images show up in many feeds like
+channel logos do. Allocation tracking with tracemalloc makes every stage a lot slower,
+compare times from runs with the same --no-allocations setting only.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+from aiohttp import web
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT))
+
+from redbot.core import data_manager  # noqa: E402
+
+# the fixtures point their images at this host, it is replaced with the local server
+FIXTURE_HOST = "http://rss-bench.invalid"
+
+# fixture file: embed image tag, the same tags a user would pick for these feeds
+EMBED_IMAGE_TAGS = {
+    "atom_news.xml": "content_image01",
+    "github_releases.xml": "media_thumbnail_plaintext",
+    "rss2_blog.xml": "content_image01",
+    "youtube_channel.xml": "media_thumbnail_plaintext",
+}
+
+# smallest valid png and jpeg headers, the image checks only look at the first bytes
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 256
+JPEG = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00" + b"\x00" * 256
+
+
+class FakeGuild:
+    def __init__(self):
+        self.id = 1
+        self.me = None
+
+
+class FakeChannel:
+    """Channel sink that only counts what would have been sent to Discord."""
+
+    def __init__(self):
+        self.id = 1
+        self.guild = FakeGuild()
+        self.name = "benchmark"
+        self.mention = "#benchmark"
+        self.messages = 0
+        self.embeds = 0
+
+    async def send(self, content=None, *, embed=None, embeds=None, **kwargs):
+        self.messages += 1
+        self.embeds += len(embeds) if embeds else int(embed is not None)
+
+
+class FakeBot:
+    def __init__(self):
+        self.loop = asyncio.get_running_loop()
+
+
+class FixtureServer:
+    """Serves every fixture under /feeds/<copy>/<fixture file> and the fixture images under /images/."""
+
+    def __init__(self):
+        self.feeds = {}
+        self.runner = None
+        self.base_url = None
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_get("/feeds/{copy}/{name}", self._feed)
+        app.router.add_get("/images/{name}", self._image)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}"
+        for path in sorted(FIXTURES.glob("*.xml")):
+            self.feeds[path.name] = path.read_bytes().replace(FIXTURE_HOST.encode(), self.base_url.encode())
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    def urls(self, count: int):
+        """Returns (url, fixture file) for `count` copies of the fixtures."""
+        names = sorted(self.feeds)
+        urls = []
+        for copy in range(count):
+            name = names[copy % len(names)]
+            urls.append((f"{self.base_url}/feeds/{copy}/{name}", name))
+        return urls
+
+    async def _feed(self, request):
+        body = self.feeds.get(request.match_info["name"])
+        if body is None:
+            return web.Response(status=404)
+        return web.Response(body=body, content_type="application/xml")
+
+    async def _image(self, request):
+        if request.match_info["name"].endswith(".png"):
+            return web.Response(body=PNG, content_type="image/png")
+        return web.Response(body=JPEG, content_type="image/jpeg")
+
+
+class StageTimer:
+    """Times stages and, with allocations on, tracks the peak and remaining memory each stage allocated."""
+
+    def __init__(self, allocations: bool):
+        self.allocations = allocations
+        self.results = {}
+
+    def __call__(self, name: str, feeds: int):
+        return _Stage(self, name, feeds)
+
+
+class _Stage:
+    def __init__(self, timer: StageTimer, name: str, feeds: int):
+        self.timer = timer
+        self.name = name
+        self.feeds = feeds
+
+    def __enter__(self):
+        if self.timer.allocations:
+            tracemalloc.reset_peak()
+            self.memory_start = tracemalloc.get_traced_memory()[0]
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        result = {"seconds": elapsed, "per_feed_ms": elapsed / self.feeds * 1000}
+        if self.timer.allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            result["peak_mib"] = (peak - self.memory_start) / 1024 / 1024
+            result["retained_mib"] = (current - self.memory_start) / 1024 / 1024
+        self.timer.results[self.name] = result
+
+
+def make_cog(data_path: str):
+    """Creates the cog with its config in a temporary folder, Red's data manager is pointed there."""
+    data_manager.basic_config = dict(data_manager.basic_config_default)
+    data_manager.basic_config["DATA_PATH"] = data_path
+    data_manager.basic_config["STORAGE_TYPE"] = "JSON"
+
+    from rss.rss import RSS
+
+    cog = RSS(FakeBot())
+    cog._session = cog._create_session()
+    return cog
+
+
+async def run_size(server: FixtureServer, count: int, allocations: bool, workers: int):
+    from redbot.core.utils.chat_formatting import bold
+
+    from rss.outbox import embed_post
+    from rss.quiet_template import compile_template
+
+    with tempfile.TemporaryDirectory() as data_path:
+        cog = make_cog(data_path)
+        channel = FakeChannel()
+        timer = StageTimer(allocations)
+        template = "$title\n$link"
+        urls = server.urls(count)
+        try:
+            with timer("fetch", count):
+                fetch_semaphore = asyncio.Semaphore(workers)
+                # everything is on one host here, so the host limit would otherwise be the only thing measured
+                host_semaphores = defaultdict(lambda: asyncio.Semaphore(workers))
+                feeds = await asyncio.gather(
+                    *(cog._fetch_for_cycle(url, fetch_semaphore, host_semaphores) for url, _ in urls)
+                )
+            errors = [feed.error for feed in feeds if getattr(feed, "error", None)]
+            if errors:
+                raise RuntimeError(f"{len(errors)} feeds could not be fetched, the first error was: {errors[0]}")
+
+            with timer("sort", count):
+                sorted_entries = [await cog._sort_by_post_time(feed.entries) for feed in feeds]
+
+            with timer("tags", count):
+                entries = [
+                    await cog._append_bs4_tags(entries[0], url) for entries, (url, _) in zip(sorted_entries, urls)
+                ]
+
+            with timer("template", count):
+                compiled = compile_template(template)
+                messages = [compiled.quiet_safe_substitute(entry, name=bold("benchmark")) for entry in entries]
+
+            with timer("embed", count):
+                for entry, message, (_, fixture) in zip(entries, messages, urls):
+                    rss_feed = {"embed_color": None, "embed_image": EMBED_IMAGE_TAGS[fixture], "embed_thumbnail": None}
+                    embeds = await cog._get_current_feed_embed(channel, rss_feed, entry, message)
+                    await cog._send_posts(channel, [embed_post(embed) for embed in embeds])
+        finally:
+            await cog.cog_unload()
+
+        results = timer.results
+        results["parse"] = {
+            "seconds": cog._poll_stats.parse_time,
+            "per_feed_ms": cog._poll_stats.parse_time / count * 1000,
+        }
+        results["sent"] = {"messages": channel.messages, "embeds": channel.embeds}
+        return results
+
+
+def print_results(count: int, results: dict, allocations: bool):
+    print(f"\n{count} feeds")
+    header = f"  {'stage':<10}{'total':>10}{'per feed':>12}"
+    if allocations:
+        header += f"{'peak alloc':>14}{'retained':>12}"
+    print(header)
+    for stage in ("fetch", "parse", "sort", "tags", "template", "embed"):
+        result = results[stage]
+        line = f"  {stage:<10}{result['seconds']:>9.3f}s{result['per_feed_ms']:>10.3f}ms"
+        if allocations and "peak_mib" in result:
+            line += f"{result['peak_mib']:>10.2f} MiB{result['retained_mib']:>8.2f} MiB"
+        print(line)
+    print("  parse is the part of fetch spent in the parser pool, added up over all workers")
+    print(f"  sent {results['sent']['messages']} messages with {results['sent']['embeds']} embeds")
+
+
+async def main(args):
+    sizes = [int(size) for size in args.sizes.split(",")]
+    allocations = not args.no_allocations
+    if allocations:
+        tracemalloc.start()
+
+    server = FixtureServer()
+    await server.start()
+    all_results = {}
+    try:
+        for count in sizes:
+            all_results[count] = await run_size(server, count, allocations, args.workers)
+            print_results(count, all_results[count], allocations)
+    finally:
+        await server.stop()
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(all_results, indent=4))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the RSS cog's feed pipeline against recorded feeds.")
+    parser.add_argument("--sizes", default="10,1000,10000", help="comma separated amounts of feeds to run")
+    parser.add_argument("--workers", type=int, default=16, help="how many feeds are fetched at the same time")
+    parser.add_argument("--no-allocations", action="store_true", help="skip tracemalloc for more accurate times")
+    parser.add_argument("--json", help="also write the results to this file")
+    asyncio.run(main(parser.parse_args()))
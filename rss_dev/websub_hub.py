@@ -0,0 +1,134 @@
+"""
+Local stand-in WebSub hub for trying out the RSS cog's push mode without a public hub.
+
+Serves an Atom feed that names this hub, accepts subscriptions to it, verifies them by calling back
+to the subscriber, and pushes new entries signed with the subscriber's secret, like YouTube's hub does.
+
+    python rss_dev/websub_hub.py --port 8791
+
+Then on the bot, with the receiver on its default port:
+
+    [p]rss settings websub http://127.0.0.1:8790
+    [p]rss add hubtest #channel http://127.0.0.1:8791/feed
+
+and publish a new entry, which the hub pushes to the bot right away:
+
+    curl -X POST http://127.0.0.1:8791/publish
+
+Subscriptions are kept in memory and lost when the hub stops.
+"""
+import argparse
+import asyncio
+import hashlib
+import hmac
+import secrets
+import time
+from xml.sax.saxutils import escape, quoteattr
+
+import aiohttp
+from aiohttp import web
+
+
+class StandInHub:
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self.topic = f"{base_url}/feed"
+        self.entries = []
+        # callback url: secret
+        self.subscribers = {}
+        self.session = None
+        for _ in range(3):
+            self.add_entry()
+
+    def add_entry(self):
+        number = len(self.entries) + 1
+        self.entries.insert(0, {"id": f"hub-entry-{number}", "title": f"Entry {number}", "updated": time.time()})
+        return self.entries[0]
+
+    def feed(self, entries: list) -> bytes:
+        items = "".join(
+            "<entry>"
+            f"<id>{escape(entry['id'])}</id>"
+            f"<title>{escape(entry['title'])}</title>"
+            f"<link href={quoteattr(self.base_url + '/entries/' + entry['id'])}/>"
+            f"<updated>{time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime(entry['updated']))}</updated>"
+            "</entry>"
+            for entry in entries
+        )
+        return (
+            '<?xml version="1.0" encoding="utf-8"?><feed xmlns="http://www.w3.org/2005/Atom">'
+            "<title>Stand-in hub feed</title><id>stand-in-hub</id>"
+            f"<link rel=\"hub\" href={quoteattr(self.base_url + '/hub')}/>"
+            f"<link rel=\"self\" href={quoteattr(self.topic)}/>"
+            f"{items}</feed>"
+        ).encode("utf-8")
+
+    async def serve_feed(self, request):
+        return web.Response(body=self.feed(self.entries), content_type="application/atom+xml")
+
+    async def subscribe(self, request):
+        form = await request.post()
+        mode = form.get("hub.mode")
+        callback = form.get("hub.callback")
+        if mode not in ("subscribe", "unsubscribe") or not callback or form.get("hub.topic") != self.topic:
+            return web.Response(status=400, text="Only subscriptions to this hub's feed are accepted.")
+        asyncio.create_task(self.verify(mode, callback, form.get("hub.secret"), form.get("hub.lease_seconds")))
+        return web.Response(status=202)
+
+    async def verify(self, mode: str, callback: str, secret: str, lease_seconds: str):
+        challenge = secrets.token_urlsafe(16)
+        params = {"hub.mode": mode, "hub.topic": self.topic, "hub.challenge": challenge}
+        if mode == "subscribe":
+            params["hub.lease_seconds"] = lease_seconds or "3600"
+        async with self.session.get(callback, params=params) as resp:
+            verified = resp.status == 200 and await resp.text() == challenge
+        print(f"{mode} of {callback}: {'verified' if verified else f'not verified (HTTP {resp.status})'}")
+        if not verified:
+            return
+        if mode == "subscribe":
+            self.subscribers[callback] = secret
+        else:
+            self.subscribers.pop(callback, None)
+
+    async def publish(self, request):
+        """Adds an entry and pushes a feed with only that entry to every subscriber."""
+        body = self.feed([self.add_entry()])
+        for callback, secret in list(self.subscribers.items()):
+            headers = {"Content-Type": "application/atom+xml"}
+            if secret:
+                signature = hmac.new(secret.encode("utf-8"), body, hashlib.sha256).hexdigest()
+                headers["X-Hub-Signature"] = f"sha256={signature}"
+            async with self.session.post(callback, data=body, headers=headers) as resp:
+                print(f"pushed {self.entries[0]['id']} to {callback}: HTTP {resp.status}")
+                if resp.status == 410:
+                    # the subscriber doesn't use this callback anymore
+                    del self.subscribers[callback]
+        return web.Response(text=f"Published {self.entries[0]['id']} to {len(self.subscribers)} subscribers.\n")
+
+
+async def main(args):
+    hub = StandInHub(f"http://{args.host}:{args.port}")
+    hub.session = aiohttp.ClientSession()
+    app = web.Application()
+    app.router.add_get("/feed", hub.serve_feed)
+    app.router.add_post("/hub", hub.subscribe)
+    app.router.add_post("/publish", hub.publish)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, args.host, args.port).start()
+    print(f"Feed at {hub.topic}, publish a new entry with: curl -X POST {hub.base_url}/publish")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await hub.session.close()
+        await runner.cleanup()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local WebSub hub to test the RSS cog's push mode.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8791)
+    try:
+        asyncio.run(main(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass